@@ -0,0 +1,236 @@
+"""Throughput benchmark for the task_10 news-feed ingestion pipeline.
+
+Generates synthetic TXT/JSON/XML input files, feeds them through the input
+processors in a scratch directory and prints one JSON object per run:
+
+    python benchmark.py --sizes 1000 10000 --formats txt json xml --batch
+
+Each run happens in a fresh subprocess so peak RSS is measured per run.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+HERE = Path(__file__).resolve().parent
+FORMATS = ("txt", "json", "xml")
+STAGES = ("parse", "normalize", "db_insert", "file_append", "statistics")
+WORDS = ("city", "council", "approves", "new", "park", "budget", "river", "festival", "opens",
+         "tonight", "sale", "bike", "used", "good", "condition", "life", "is", "what",
+         "happens", "while", "you", "are", "busy", "making", "other", "plans")
+
+
+# ----------------------------
+# SYNTHETIC INPUT
+# ----------------------------
+
+def synthetic_records(count: int, seed: int = 42):
+    """Yield ``count`` valid records cycling through NEWS, AD and QUOTE."""
+    rng = random.Random(seed)
+
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).upper() + "."
+
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            yield {"type": "NEWS", "text": f"{sentence(12)} item {i}", "city": rng.choice(("Kyiv", "Lviv", "Odesa"))}
+        elif kind == 1:
+            yield {"type": "AD", "text": f"{sentence(8)} lot {i}", "expiration_date": f"2030-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"}
+        else:
+            yield {"type": "QUOTE", "quote": f"{sentence(10)} #{i}", "author": rng.choice(("JOHN LENNON", "ada lovelace", "Mark Twain"))}
+
+
+def write_input_file(path: Path, fmt: str, count: int):
+    """Write ``count`` synthetic records to ``path`` in the given input format."""
+    fields = {"NEWS": ("text", "city"), "AD": ("text", "expiration_date"), "QUOTE": ("quote", "author")}
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "txt":
+            for record in synthetic_records(count):
+                f.write("::".join([record["type"], *(record[k] for k in fields[record["type"]])]) + "\n")
+        elif fmt == "json":
+            f.write("[\n")
+            for i, record in enumerate(synthetic_records(count)):
+                f.write(("," if i else "") + json.dumps(record) + "\n")
+            f.write("]\n")
+        else:
+            f.write("<records>\n")
+            for record in synthetic_records(count):
+                f.write("<record>" + "".join(f"<{k}>{escape(v)}</{k}>" for k, v in record.items()) + "</record>\n")
+            f.write("</records>\n")
+
+
+# ----------------------------
+# STAGE TIMING
+# ----------------------------
+
+class StageTimer:
+    """Accumulates exclusive wall time per stage; nested timed calls are not double counted."""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self._stack = []
+
+    def start(self):
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def stop(self, stage):
+        started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.totals[stage] += elapsed - nested
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def wrap(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stop(stage)
+        return wrapper
+
+    def wrap_generator(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            iterator = iter(func(*args, **kwargs))
+            while True:
+                self.start()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.stop(stage)
+                yield item
+        return wrapper
+
+
+def instrument(feed, timer: StageTimer):
+    """Patch the task_10 module so every pipeline stage reports to ``timer``."""
+    for name in ("normalize_case", "normalize_field"):
+        setattr(feed, name, timer.wrap("normalize", getattr(feed, name)))
+    for field, normalizer in feed.FIELD_NORMALIZERS.items():
+        feed.FIELD_NORMALIZERS[field] = timer.wrap("normalize", normalizer)
+    for name in ("_insert", "insert_many"):
+        setattr(feed.DatabaseManager, name, timer.wrap("db_insert", getattr(feed.DatabaseManager, name)))
+    feed.append_to_file = timer.wrap("file_append", feed.append_to_file)
+    feed.FeedBatch.commit = timer.wrap("file_append", feed.FeedBatch.commit)
+    feed.StatisticsEngine.sync = timer.wrap("statistics", feed.StatisticsEngine.sync)
+    feed.StatisticsEngine.rebuild = timer.wrap("statistics", feed.StatisticsEngine.rebuild)
+    for processor in feed.PROCESSORS:
+        processor.reader = staticmethod(timer.wrap_generator("parse", processor.reader))
+    feed.iter_txt_positions = timer.wrap_generator("parse", feed.iter_txt_positions)
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ----------------------------
+# RUNS
+# ----------------------------
+
+def run_once(fmt: str, size: int, batch: bool, batch_size: int = None) -> dict:
+    """Benchmark one input file in a scratch directory (call in a fresh process)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        sys.path.insert(0, str(HERE))
+        import task_10 as feed
+
+        input_file = Path("input_files") / f"bench.{fmt}"
+        input_file.parent.mkdir(exist_ok=True)
+        write_input_file(input_file, fmt, size)
+
+        timer = StageTimer()
+        instrument(feed, timer)
+        processor = next(p for p in feed.PROCESSORS if p.extension == f".{fmt}")
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor(input_file, batch=batch, batch_size=batch_size).process_file()
+        elapsed = time.perf_counter() - started
+
+        feed.get_app().close()
+        os.chdir(HERE)
+
+    return {
+        "format": fmt,
+        "records": size,
+        "batch": batch,
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 6),
+        "records_per_sec": round(size / elapsed, 1) if elapsed else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": {stage: round(seconds, 6) for stage, seconds in timer.totals.items()},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the news feed ingestion pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="records per input file")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--batch", action="store_true", help="use the batched ingestion mode")
+    parser.add_argument("--batch-size", type=int, default=None, help="commit every N records in batch mode")
+    parser.add_argument("--output", type=Path, help="append JSON lines here instead of stdout")
+    parser.add_argument("--run-one", nargs=2, metavar=("FORMAT", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        fmt, size = args.run_one
+        print(json.dumps(run_once(fmt, int(size), args.batch, args.batch_size)))
+        return 0
+
+    meta = {"revision": git_revision(), "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for size in args.sizes:
+            for fmt in args.formats:
+                cmd = [sys.executable, str(Path(__file__).resolve()), "--run-one", fmt, str(size)]
+                if args.batch:
+                    cmd.append("--batch")
+                if args.batch_size:
+                    cmd += ["--batch-size", str(args.batch_size)]
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    print(result.stderr, file=sys.stderr)
+                    return result.returncode
+                out.write(json.dumps({**meta, **json.loads(result.stdout)}) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
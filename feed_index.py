@@ -0,0 +1,222 @@
+import argparse
+import datetime
+import mmap
+import sys
+from pathlib import Path
+
+from feed_snapshot import NO_TIME, iter_feed_records
+from feed_stats import OUTPUT_FILE
+from sqlite_storage import SQLiteStorage, StorageSettings
+
+
+FEED_INDEX_FILE = Path("news_feed.idx")
+
+# The index is derived data and can always be rebuilt, so it skips fsync.
+INDEX_SETTINGS = StorageSettings(synchronous="OFF")
+
+
+# ----------------------------
+# OFFSET INDEX
+# ----------------------------
+
+class FeedIndex:
+    """Sidecar SQLite index of the feed: record number -> byte range, type, city and date.
+
+    ``sync`` parses only what was appended since the last sync (the parsed feed
+    offset is stored in the index), so it is cheap to call after every append.
+    A feed that shrank is indexed from scratch.
+    """
+
+    def __init__(self, feed_path=OUTPUT_FILE, index_path=FEED_INDEX_FILE, settings: StorageSettings = None):
+        self.feed_path = Path(feed_path)
+        self.storage = SQLiteStorage(index_path, settings or INDEX_SETTINGS)
+        with self.storage.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    n INTEGER PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    city TEXT,
+                    date TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_type ON records (type, n)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_city ON records (city, n)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_date ON records (date, n)")
+            conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+        self.conn = self.storage.conn
+
+    def feed_offset(self) -> int:
+        row = self.conn.execute("SELECT value FROM state WHERE key='feed_offset'").fetchone()
+        return row[0] if row else 0
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(n) + 1, 0) FROM records").fetchone()[0]
+
+    def sync(self) -> int:
+        """Index records appended to the feed since the last sync; returns how many were added."""
+        if not self.feed_path.exists():
+            return 0
+        start = self.feed_offset()
+        reset = self.feed_path.stat().st_size < start
+        if reset:
+            start = 0
+        rows, end = [], start
+        n = 0 if reset else self.count()
+        for offset, length, end, kind, _, place, timestamp in iter_feed_records(self.feed_path, start):
+            date = None if timestamp == NO_TIME else datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d")
+            rows.append((n, offset, length, kind, place if kind == "NEWS" else None, date))
+            n += 1
+        if not rows and not reset:
+            return 0
+
+        with self.storage.transaction(len(rows)) as conn:
+            if reset:
+                conn.execute("DELETE FROM records")
+            conn.executemany("INSERT INTO records (n, offset, length, type, city, date) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('feed_offset', ?)", (end,))
+        return len(rows)
+
+    def rebuild(self) -> int:
+        with self.storage.transaction() as conn:
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM state")
+        return self.sync()
+
+    def close(self):
+        self.storage.close()
+
+
+# ----------------------------
+# RANDOM-ACCESS READER
+# ----------------------------
+
+class FeedReader:
+    """Reads feed records by number or by type/city/date through a FeedIndex.
+
+    The feed file is memory-mapped and each record is sliced straight out of the
+    mapping, so record N, the last N records or page P cost one index lookup no
+    matter how large the feed is.
+    """
+
+    def __init__(self, index: FeedIndex):
+        self.index = index
+        self._file = None
+        self._map = None
+
+    def _mapped(self, end: int) -> mmap.mmap:
+        """The feed mapping, re-mapped if the feed has grown past it."""
+        if self._map is None or len(self._map) < end:
+            self.close()
+            self._file = open(self.index.feed_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _read(self, rows) -> list:
+        rows = list(rows)
+        if not rows:
+            return []
+        mapped = self._mapped(max(offset + length for offset, length in rows))
+        return [mapped[offset:offset + length].decode("utf-8", errors="replace").rstrip("\r\n")
+                for offset, length in rows]
+
+    def __len__(self):
+        return self.index.count()
+
+    def record(self, n: int) -> str:
+        """Record number ``n`` (0-based; negative counts from the end), or None."""
+        if n < 0:
+            n += self.index.count()
+        records = self._read(self.index.conn.execute("SELECT offset, length FROM records WHERE n=?", (n,)))
+        return records[0] if records else None
+
+    def page(self, page: int, size: int = 20) -> list:
+        """Records of the 0-based page ``page`` of ``size`` records, oldest first."""
+        return self._read(self.index.conn.execute(
+            "SELECT offset, length FROM records WHERE n >= ? AND n < ? ORDER BY n",
+            (page * size, (page + 1) * size)))
+
+    def tail(self, count: int = 10) -> list:
+        """The last ``count`` records, oldest first."""
+        total = self.index.count()
+        return self._read(self.index.conn.execute(
+            "SELECT offset, length FROM records WHERE n >= ? ORDER BY n", (max(0, total - count),)))
+
+    def find(self, record_type: str = None, city: str = None, date_from: str = None,
+             date_to: str = None, limit: int = 100, after: int = -1) -> list:
+        """(n, record) pairs matching every given filter; dates are inclusive YYYY-MM-DD strings.
+
+        Pass the last ``n`` seen as ``after`` to fetch the next page.
+        """
+        where, params = ["n > ?"], [after]
+        for clause, value in (("type = ?", record_type and record_type.upper()), ("city = ?", city),
+                              ("date >= ?", date_from), ("date <= ?", date_to)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        rows = self.index.conn.execute(
+            f"SELECT n, offset, length FROM records WHERE {' AND '.join(where)} ORDER BY n LIMIT ?",
+            (*params, limit)).fetchall()
+        return list(zip((n for n, _, _ in rows), self._read((offset, length) for _, offset, length in rows)))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Random access to news feed records through the offset index.")
+    parser.add_argument("--feed", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--index", type=Path, default=FEED_INDEX_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="index the whole feed again")
+    record = commands.add_parser("record", help="show record N (negative counts from the end)")
+    record.add_argument("n", type=int)
+    tail = commands.add_parser("tail", help="show the last records")
+    tail.add_argument("count", type=int, nargs="?", default=10)
+    page = commands.add_parser("page", help="show one page of records")
+    page.add_argument("page", type=int)
+    page.add_argument("--size", type=int, default=20)
+    find = commands.add_parser("find", help="show records by type, city or date")
+    find.add_argument("--type", choices=("NEWS", "AD", "QUOTE", "OTHER"))
+    find.add_argument("--city")
+    find.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    find.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    find.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    index = FeedIndex(args.feed, args.index)
+    if args.command == "rebuild":
+        print(f"✅ Indexed {index.rebuild()} records")
+        index.close()
+        return 0
+
+    index.sync()
+    reader = FeedReader(index)
+    try:
+        if args.command == "record":
+            records = [reader.record(args.n)]
+            if records[0] is None:
+                print(f"❌ No record {args.n}")
+                return 1
+        elif args.command == "tail":
+            records = reader.tail(args.count)
+        elif args.command == "page":
+            records = reader.page(args.page, args.size)
+        else:
+            records = [record for _, record in reader.find(args.type, args.city, args.date_from,
+                                                           args.date_to, args.limit)]
+        for text in records:
+            print(text)
+            print("-" * 40)
+    finally:
+        reader.close()
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import gzip
+import json
+import os
+import shutil
+import time
+from collections import Counter
+from pathlib import Path
+
+from feed_stats import OUTPUT_FILE, ApproximateWordStats
+
+
+class SegmentSettings:
+    """When the active feed file is rolled into a segment, and what happens to closed segments.
+
+    The feed rotates once it reaches ``max_bytes`` or has been active for
+    ``max_age_hours`` (either may be None). Closed segments are gzip-compressed when
+    ``compress`` is set; runs of consecutive segments smaller than ``compact_below``
+    bytes are merged; segments beyond the newest ``keep_segments`` or closed more than
+    ``keep_days`` ago are deleted, statistics included.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_age_hours: float = None,
+                 compress: bool = False, compact_below: int = None,
+                 keep_segments: int = None, keep_days: float = None):
+        self.max_bytes = max_bytes
+        self.max_age_hours = max_age_hours
+        self.compress = compress
+        self.compact_below = compact_below
+        self.keep_segments = keep_segments
+        self.keep_days = keep_days
+
+
+class FeedSegments:
+    """Closed segments of the feed file plus their per-segment statistics.
+
+    The feed file itself stays the active segment, so everything that appends to or
+    reads it keeps working. Rotation moves it to ``<segment_dir>/NNNNNN.txt`` (or
+    ``.txt.gz``) next to an ``NNNNNN.stats.json`` with its word/letter counters;
+    ``manifest.json`` lists the segments. ``totals()`` merges the counters of all
+    closed segments on demand, so statistics only ever recount the active segment.
+    """
+
+    def __init__(self, feed_path=OUTPUT_FILE, segment_dir=None, settings: SegmentSettings = None):
+        self.feed_path = Path(feed_path)
+        self.segment_dir = Path(segment_dir or self.feed_path.with_suffix(".segments"))
+        self.settings = settings or SegmentSettings()
+        self.manifest = self._load_manifest()
+        self._totals = None
+        self._approx_states = []
+
+    # ---- manifest ----
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.segment_dir / "manifest.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"next_id": 1, "active_since": time.time(), "segments": []}
+
+    def _save_manifest(self):
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.segment_dir / "manifest.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.segment_dir / "manifest.json")
+        self._totals = None
+
+    @property
+    def segments(self) -> list:
+        return self.manifest["segments"]
+
+    def segment_path(self, segment) -> Path:
+        return self.segment_dir / segment["file"]
+
+    def open_segment(self, segment):
+        """Binary file object over a closed segment's text, compressed or not."""
+        path = self.segment_path(segment)
+        return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+    # ---- rotation ----
+
+    def rotation_due(self) -> bool:
+        try:
+            size = self.feed_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if not size:
+            return False
+        settings = self.settings
+        if settings.max_bytes and size >= settings.max_bytes:
+            return True
+        age = time.time() - self.manifest["active_since"]
+        return bool(settings.max_age_hours and age >= settings.max_age_hours * 3600)
+
+    def rotate(self, stats) -> dict:
+        """Close the active feed file as a new segment; returns its manifest entry (None if empty).
+
+        ``stats`` is the StatisticsEngine of the feed: it is synced first so the
+        segment's counters are complete, then recounts the new, empty active file.
+        """
+        if not self.feed_path.exists() or not self.feed_path.stat().st_size:
+            return None
+        stats.sync()
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        segment_id = self.manifest["next_id"]
+        name = f"{segment_id:06d}"
+
+        self._write_stats(name, stats.segment_state())
+        target = self.segment_dir / f"{name}.txt"
+        os.replace(self.feed_path, target)
+        self.feed_path.touch()
+        if self.settings.compress:
+            target = self._compress(target)
+
+        now = time.time()
+        segment = {"id": segment_id, "file": target.name, "stats": f"{name}.stats.json",
+                   "bytes": target.stat().st_size, "opened": self.manifest["active_since"], "closed": now}
+        self.segments.append(segment)
+        self.manifest.update(next_id=segment_id + 1, active_since=now)
+        self._save_manifest()
+
+        self.compact()
+        self.apply_retention()
+        stats.rebuild()
+        return segment
+
+    def _write_stats(self, name, state: dict):
+        with open(self.segment_dir / f"{name}.stats.json", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def _compress(self, path: Path) -> Path:
+        target = path.with_name(path.name + ".gz")
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()
+        return target
+
+    # ---- compaction and retention ----
+
+    def compact(self) -> int:
+        """Merge runs of consecutive segments below ``compact_below`` bytes; returns segments removed."""
+        limit = self.settings.compact_below
+        if not limit:
+            return 0
+        result, run, replaced = [], [], []
+
+        def close_run():
+            if len(run) > 1:
+                result.append(self._merge(run))
+                replaced.extend(run)
+            else:
+                result.extend(run)
+            run.clear()
+
+        for segment in self.segments:
+            if segment["bytes"] >= limit:
+                close_run()
+                result.append(segment)
+                continue
+            run.append(segment)
+            if sum(s["bytes"] for s in run) >= limit:
+                close_run()
+        close_run()
+        if not replaced:
+            return 0
+
+        removed = len(self.segments) - len(result)
+        self.manifest["segments"] = result
+        self._save_manifest()
+        for segment in replaced:
+            self._delete(segment)
+        return removed
+
+    def _merge(self, run) -> dict:
+        """Write the concatenation of ``run`` as one new segment; the old files are left in place."""
+        last_id = run[-1].get("last_id", run[-1]["id"])
+        name = f"{run[0]['id']:06d}-{last_id:06d}"
+        parts = [self._read_stats(segment) for segment in run]
+        target = self.segment_dir / f"{name}.txt"
+        with open(target, "wb") as out:
+            for segment in run:
+                with self.open_segment(segment) as src:
+                    shutil.copyfileobj(src, out)
+        if self.settings.compress:
+            target = self._compress(target)
+        self._write_stats(name, merge_stats(parts))
+        return {**run[0], "last_id": last_id, "file": target.name, "stats": f"{name}.stats.json",
+                "bytes": target.stat().st_size, "closed": run[-1]["closed"]}
+
+    def _delete(self, segment):
+        for path in (self.segment_path(segment), self.segment_dir / segment["stats"]):
+            if path.exists():
+                path.unlink()
+
+    def apply_retention(self) -> list:
+        """Delete segments beyond ``keep_segments`` or older than ``keep_days``; returns them."""
+        keep = list(self.segments)
+        if self.settings.keep_segments is not None:
+            keep = keep[-self.settings.keep_segments:] if self.settings.keep_segments else []
+        if self.settings.keep_days is not None:
+            cutoff = time.time() - self.settings.keep_days * 86400
+            keep = [s for s in keep if s["closed"] >= cutoff]
+        dropped = [s for s in self.segments if s not in keep]
+        if not dropped:
+            return []
+        self.manifest["segments"] = keep
+        self._save_manifest()
+        for segment in dropped:
+            self._delete(segment)
+        return dropped
+
+    # ---- statistics ----
+
+    def _read_stats(self, segment) -> dict:
+        with open(self.segment_dir / segment["stats"], "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def totals(self):
+        """(words, letters, uppercase) Counters merged over every closed segment, cached."""
+        if self._totals is None:
+            merged = merge_stats(self._read_stats(segment) for segment in self.segments)
+            self._totals = merged["words"], merged["letters"], merged["uppercase"]
+            self._approx_states = [merged["approx"]] if "approx" in merged else []
+        return self._totals
+
+    def approx_states(self) -> list:
+        """Approximate word summaries of closed segments (see ApproximateWordStats), merged."""
+        self.totals()
+        return self._approx_states
+
+
+def merge_stats(parts) -> dict:
+    """Sum per-segment statistics; approximate word summaries are merged into the first one."""
+    merged = {"words": Counter(), "letters": Counter(), "uppercase": Counter()}
+    approx = None
+    for part in parts:
+        for key in ("words", "letters", "uppercase"):
+            merged[key].update(part[key])
+        if "approx" in part:
+            if approx is None:
+                approx = ApproximateWordStats()
+                approx.load_state(part["approx"])
+            else:
+                approx.merge_state(part["approx"])
+    if approx is not None:
+        merged["approx"] = approx.to_state()
+    return merged
@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from task_10 import (
+    DB_FILE, DEFAULT_INPUT_FOLDER, OUTPUT_FILE,
+    FeedApp, FeedBatch, normalize_record, parse_input_file, pending_input_files, publish_record,
+)
+
+
+class QueuedRecord:
+    """A normalized record waiting for the writer, with its arrival time for latency tracking."""
+
+    __slots__ = ("record", "received", "on_commit")
+
+    def __init__(self, record, on_commit=None):
+        self.record = record
+        self.received = time.monotonic()
+        self.on_commit = on_commit
+
+
+class LatencyTracker:
+    """Keeps the most recent arrival-to-commit latencies and reports percentiles (in ms)."""
+
+    def __init__(self, window: int = 10_000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds * 1000)
+        self.count += 1
+
+    def percentiles(self, points=(50, 90, 99)) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {f"p{p}": None for p in points}
+        return {f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 3)
+                for p in points}
+
+
+# ----------------------------
+# FEED SERVICE
+# ----------------------------
+
+class FeedService:
+    """Long-running ingestion daemon around the task_10 formatters.
+
+    Producers (a polled input folder, a TCP socket and stdin, each optional) put
+    normalized records on a bounded asyncio queue; when it is full they wait, which
+    slows socket clients and stdin down (backpressure). One writer coroutine drains
+    the queue in batches of up to ``batch_size`` records or ``flush_interval``
+    seconds and commits each batch through FeedBatch on a dedicated thread, so the
+    SQLite connection is only ever used from that thread.
+    """
+
+    def __init__(self, app: FeedApp, watch_folder: Path = None, host: str = "127.0.0.1",
+                 port: int = None, read_stdin: bool = False, queue_size: int = 10_000,
+                 batch_size: int = 500, flush_interval: float = 0.2, poll_interval: float = 1.0):
+        self.app = app
+        self.watch_folder = watch_folder
+        self.host = host
+        self.port = port
+        self.read_stdin = read_stdin
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.latency = LatencyTracker()
+        self.committed = 0
+        self.rejected = 0
+        self.queue = None
+        self._stopping = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feed-writer")
+        self._in_flight = set()
+
+    # ---- lifecycle ----
+
+    async def run(self):
+        """Run until stopped (signal, ``stop()``, or end of stdin when it is the only producer)."""
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        self._stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # not supported on this platform / not the main thread
+
+        writer = asyncio.create_task(self._writer())
+        producers = []
+        server = None
+        if self.watch_folder:
+            producers.append(asyncio.create_task(self._watch_folder()))
+        if self.port is not None:
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        if self.read_stdin:
+            stdin_task = asyncio.create_task(self._read_stdin())
+            if not producers and server is None:
+                stdin_task.add_done_callback(lambda _: self.stop())
+            producers.append(stdin_task)
+
+        await self._stopping.wait()
+
+        # Graceful drain: stop accepting input, then let the writer commit what is queued.
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        for task in producers:
+            task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+        await self.queue.put(None)
+        await writer
+        await loop.run_in_executor(self._executor, self.app.close)
+        self._executor.shutdown()
+        self.report()
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def report(self):
+        print(json.dumps({"committed": self.committed, "rejected": self.rejected,
+                          "latency_ms": self.latency.percentiles()}), file=sys.stderr)
+
+    # ---- producers ----
+
+    async def enqueue(self, raw, on_commit=None) -> bool:
+        """Validate, normalize and queue one raw record; waits while the queue is full."""
+        record = normalize_record(raw)
+        if record is None:
+            self.rejected += 1
+            return False
+        await self.queue.put(QueuedRecord(record, on_commit))
+        return True
+
+    async def _watch_folder(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            for path in pending_input_files(self.watch_folder):
+                if path in self._in_flight:
+                    continue
+                self._in_flight.add(path)
+                _, records, warnings = await loop.run_in_executor(None, parse_input_file, path)
+                for warning in warnings:
+                    print(warning, file=sys.stderr)
+                if records is None:
+                    continue  # unparsable file stays in place (and in _in_flight) until fixed
+                if not records:
+                    self._file_done(path)
+                for i, (_, record) in enumerate(records):
+                    done = (lambda p=path: self._file_done(p)) if i == len(records) - 1 else None
+                    await self.queue.put(QueuedRecord(record, done))
+            await asyncio.sleep(self.poll_interval)
+
+    def _file_done(self, path: Path):
+        os.remove(path)
+        self._in_flight.discard(path)
+        print(f"✅ Processed and removed file: {path}", file=sys.stderr)
+
+    async def _handle_client(self, reader, writer):
+        """JSON-lines protocol: one record per line, answered with 'ok' or 'error: ...'."""
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    accepted = await self.enqueue(json.loads(line))
+                    writer.write(b"ok\n" if accepted else b"error: malformed record\n")
+                except json.JSONDecodeError as exc:
+                    self.rejected += 1
+                    writer.write(f"error: {exc}\n".encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_stdin(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        async for line in reader:
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError:
+                self.rejected += 1
+                print(f"⚠️ Skipping malformed line: {line.decode(errors='replace').strip()}", file=sys.stderr)
+                continue
+            if not await self.enqueue(raw):
+                print(f"⚠️ Skipping malformed record: {raw}", file=sys.stderr)
+
+    # ---- writer ----
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            item = await self.queue.get()
+            if item is None:
+                break
+            items = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(items) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                items.append(item)
+
+            try:
+                await loop.run_in_executor(self._executor, self._commit, [i.record for i in items])
+            except Exception as exc:  # keep the daemon alive; the batch is reported as lost
+                print(f"❌ Failed to commit {len(items)} records: {exc}", file=sys.stderr)
+                continue
+            now = time.monotonic()
+            for queued in items:
+                self.latency.add(now - queued.received)
+                if queued.on_commit:
+                    queued.on_commit()
+            self.committed += len(items)
+
+    def _commit(self, records):
+        batch = FeedBatch(self.app)
+        for record in records:
+            publish_record(record, batch, normalized=True, app=self.app)
+        batch.commit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the news feed as a long-lived ingestion service.")
+    parser.add_argument("--feed", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--db", type=Path, default=DB_FILE)
+    parser.add_argument("--watch", type=Path, nargs="?", const=DEFAULT_INPUT_FOLDER,
+                        help=f"poll a folder for input files (default folder: {DEFAULT_INPUT_FOLDER})")
+    parser.add_argument("--port", type=int, help="accept JSON-lines records on this TCP port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--stdin", action="store_true", help="read JSON-lines records from stdin")
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.2, help="max seconds a batch waits to fill")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    if not (args.watch or args.port is not None or args.stdin):
+        parser.error("enable at least one producer: --watch, --port or --stdin")
+
+    service = FeedService(FeedApp(output_file=args.feed, db_path=args.db), watch_folder=args.watch,
+                          host=args.host, port=args.port, read_stdin=args.stdin,
+                          queue_size=args.queue_size, batch_size=args.batch_size,
+                          flush_interval=args.flush_interval, poll_interval=args.poll_interval)
+    asyncio.run(service.run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import argparse
+import calendar
+import datetime
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from feed_stats import OUTPUT_FILE, WORD_PATTERN
+
+
+SNAPSHOT_DIR = Path("news_feed.snap")
+SNAPSHOT_VERSION = 1
+
+# A record ends with a line of exactly 40 dashes (written as "\n" or os.linesep).
+SEPARATOR = re.compile(rb"^-{40}\r?\n", re.MULTILINE)
+
+TYPES = ("OTHER", "NEWS", "AD", "QUOTE")
+HEADERS = (("NEWS", "NEWS"), ("PRIVATE AD", "AD"), ("QUOTE", "QUOTE"))
+NO_TIME = -(2 ** 63)
+
+# column file -> array typecode; string columns point into heap.bin
+COLUMNS = {
+    "offset": "q",      # byte offset of the record in the feed file
+    "length": "q",      # record length in bytes, separator line excluded
+    "type": "B",        # index into TYPES
+    "time": "q",        # news date / ad expiration as seconds since the epoch, or NO_TIME
+    "text_pos": "q",
+    "text_len": "i",
+    "place_pos": "q",   # city for news, author for quotes, empty for ads
+    "place_len": "i",
+}
+
+
+# ----------------------------
+# FEED PARSING
+# ----------------------------
+
+def _timestamp(value: str, fmt: str) -> int:
+    try:
+        return calendar.timegm(datetime.datetime.strptime(value.strip(), fmt).timetuple())
+    except ValueError:
+        return NO_TIME
+
+
+def parse_record(block: str):
+    """Split one formatted feed record into (type, text, place, timestamp)."""
+    lines = block.replace("\r\n", "\n").split("\n")
+    header, body, footer = lines[0], lines[1:-1], lines[-1] if len(lines) > 1 else ""
+    kind = next((name for prefix, name in HEADERS if header.startswith(prefix)), "OTHER")
+    text, place, timestamp = "\n".join(body), "", NO_TIME
+
+    if kind == "NEWS" and footer.startswith("City: "):
+        place, _, date = footer[len("City: "):].rpartition(", ")
+        timestamp = _timestamp(date, "%Y-%m-%d %H:%M")
+    elif kind == "AD" and footer.startswith("Expires: "):
+        timestamp = _timestamp(footer[len("Expires: "):].split(" (")[0], "%Y-%m-%d")
+    elif kind == "QUOTE" and footer.startswith("— "):
+        place = footer[len("— "):].rpartition(", shared on ")[0]
+        if text.startswith('"') and text.endswith('"'):
+            text = text[1:-1]
+    return kind, text, place, timestamp
+
+
+def iter_feed_records(feed_path, start: int = 0, chunk_size: int = 1 << 20):
+    """Yield (offset, length, end, type, text, place, timestamp) for complete records after byte ``start``.
+
+    ``end`` is the offset just past the record's separator line, i.e. where parsing
+    can resume. A trailing record without its separator yet is not yielded.
+    """
+    with open(feed_path, "rb") as f:
+        f.seek(start)
+        buf, base = b"", start
+        while True:
+            chunk = f.read(chunk_size)
+            buf += chunk
+            pos = 0
+            for match in SEPARATOR.finditer(buf):
+                block = buf[pos:match.start()]
+                yield (base + pos, len(block), base + match.end(),
+                       *parse_record(block.rstrip(b"\r\n").decode("utf-8", errors="replace")))
+                pos = match.end()
+            buf, base = buf[pos:], base + pos
+            if not chunk:
+                return
+
+
+# ----------------------------
+# SNAPSHOT WRITER
+# ----------------------------
+
+class SnapshotWriter:
+    """Keeps a columnar snapshot of the feed file up to date.
+
+    The snapshot is a directory with one flat binary file per column (see COLUMNS),
+    a heap.bin of UTF-8 strings and a meta.json holding the record count and how
+    far into the feed has been parsed. Columns are only ever appended to; meta.json
+    is replaced last, so bytes past its count (left by a crash) are cut on the
+    next sync. Like StatisticsEngine, a feed that shrank is parsed from scratch.
+    """
+
+    def __init__(self, feed_path=OUTPUT_FILE, snapshot_dir=SNAPSHOT_DIR):
+        self.feed_path = Path(feed_path)
+        self.snapshot_dir = Path(snapshot_dir)
+
+    def read_meta(self) -> dict:
+        try:
+            with open(self.snapshot_dir / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") == SNAPSHOT_VERSION and meta.get("byteorder") == sys.byteorder:
+                return meta
+        except (OSError, ValueError):
+            pass
+        return {"version": SNAPSHOT_VERSION, "byteorder": sys.byteorder,
+                "count": 0, "feed_offset": 0, "heap_size": 0}
+
+    def sync(self) -> int:
+        """Append records written to the feed since the last sync; returns how many were added."""
+        if not self.feed_path.exists():
+            return 0
+        meta = self.read_meta()
+        reset = self.feed_path.stat().st_size < meta["feed_offset"]
+        if reset:
+            meta = {**meta, "count": 0, "feed_offset": 0, "heap_size": 0}
+
+        columns = {name: array(code) for name, code in COLUMNS.items()}
+        heap = bytearray()
+        feed_offset = meta["feed_offset"]
+        for offset, length, end, kind, text, place, timestamp in iter_feed_records(self.feed_path, feed_offset):
+            columns["offset"].append(offset)
+            columns["length"].append(length)
+            columns["type"].append(TYPES.index(kind))
+            columns["time"].append(timestamp)
+            for field, value in (("text", text), ("place", place)):
+                data = value.encode("utf-8")
+                columns[f"{field}_pos"].append(meta["heap_size"] + len(heap))
+                columns[f"{field}_len"].append(len(data))
+                heap += data
+            feed_offset = end
+        if feed_offset == meta["feed_offset"] and not reset:
+            return 0
+
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        count = meta["count"]
+        for name, values in columns.items():
+            self._append(name, count * values.itemsize, values.tobytes())
+        self._append("heap", meta["heap_size"], heap, suffix=".bin")
+
+        added = len(columns["offset"])
+        meta.update(count=count + added, feed_offset=feed_offset, heap_size=meta["heap_size"] + len(heap))
+        tmp = self.snapshot_dir / "meta.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.snapshot_dir / "meta.json")
+        return added
+
+    def rebuild(self) -> int:
+        """Discard the snapshot and parse the whole feed again."""
+        meta_path = self.snapshot_dir / "meta.json"
+        if meta_path.exists():
+            meta_path.unlink()
+        return self.sync()
+
+    def _append(self, name, keep: int, data: bytes, suffix: str = ".col"):
+        path = self.snapshot_dir / (name + suffix)
+        with open(path, "r+b" if path.exists() else "wb") as f:
+            f.truncate(keep)
+            f.seek(keep)
+            f.write(data)
+
+
+# ----------------------------
+# SNAPSHOT READER
+# ----------------------------
+
+class FeedSnapshot:
+    """Read-only, memory-mapped view of a feed snapshot.
+
+    Columns are exposed as typed memoryviews over the mapped files, so nothing is
+    parsed or copied up front; strings are decoded from the heap on access.
+    """
+
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.meta = SnapshotWriter(snapshot_dir=snapshot_dir).read_meta()
+        self.count = self.meta["count"]
+        self._maps = []
+        self._views = []
+        self.columns = {name: self._map(name + ".col", code, self.count) for name, code in COLUMNS.items()}
+        self.heap = self._map("heap.bin", "B", self.meta["heap_size"])
+
+    def _map(self, filename, code, length):
+        if not length:
+            return memoryview(array(code))
+        with open(self.snapshot_dir / filename, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        base = memoryview(mapped)
+        typed = base.cast(code)
+        view = typed[:length]
+        self._maps.append(mapped)
+        self._views += [view, typed, base]
+        return view
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views, self._maps = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _string(self, field, i) -> str:
+        pos = self.columns[f"{field}_pos"][i]
+        return bytes(self.heap[pos:pos + self.columns[f"{field}_len"][i]]).decode("utf-8")
+
+    def record(self, i) -> dict:
+        timestamp = self.columns["time"][i]
+        return {
+            "type": TYPES[self.columns["type"][i]],
+            "text": self._string("text", i),
+            "place": self._string("place", i),
+            "timestamp": None if timestamp == NO_TIME else timestamp,
+            "offset": self.columns["offset"][i],
+            "length": self.columns["length"][i],
+        }
+
+    def type_counts(self) -> Counter:
+        """Records per type."""
+        return Counter({TYPES[code]: n for code, n in Counter(self.columns["type"]).items()})
+
+    def between(self, start: datetime.datetime, end: datetime.datetime, record_type: str = None) -> list:
+        """Indexes of records timestamped in [start, end), optionally of one type only."""
+        low, high = calendar.timegm(start.timetuple()), calendar.timegm(end.timetuple())
+        times, types = self.columns["time"], self.columns["type"]
+        code = TYPES.index(record_type) if record_type else None
+        return [i for i in range(self.count)
+                if low <= times[i] < high and (code is None or types[i] == code)]
+
+    def word_counts(self) -> Counter:
+        """Lowercase word counts over record texts (headers and footers are not included)."""
+        words = Counter()
+        for i in range(self.count):
+            words.update(WORD_PATTERN.findall(self._string("text", i).lower()))
+        return words
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query the columnar snapshot of the news feed.")
+    parser.add_argument("--feed", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--snapshot", type=Path, default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("sync", help="append new feed records to the snapshot")
+    commands.add_parser("rebuild", help="rebuild the snapshot from the whole feed")
+    commands.add_parser("counts", help="records per type")
+    words = commands.add_parser("words", help="most common words in record texts")
+    words.add_argument("--top", type=int, default=20)
+    between = commands.add_parser("between", help="records dated in [START, END)")
+    between.add_argument("start", type=datetime.datetime.fromisoformat)
+    between.add_argument("end", type=datetime.datetime.fromisoformat)
+    between.add_argument("--type", choices=TYPES[1:])
+    args = parser.parse_args(argv)
+
+    writer = SnapshotWriter(args.feed, args.snapshot)
+    if args.command in ("sync", "rebuild"):
+        added = writer.sync() if args.command == "sync" else writer.rebuild()
+        print(f"✅ {added} records added to {args.snapshot}")
+        return 0
+
+    writer.sync()
+    with FeedSnapshot(args.snapshot) as snapshot:
+        if args.command == "counts":
+            for record_type, n in sorted(snapshot.type_counts().items()):
+                print(f"{record_type}: {n}")
+        elif args.command == "words":
+            for word, n in snapshot.word_counts().most_common(args.top):
+                print(f"{word}: {n}")
+        else:
+            for i in snapshot.between(args.start, args.end, args.type):
+                print(json.dumps(snapshot.record(i), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
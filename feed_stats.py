@@ -0,0 +1,376 @@
+import atexit
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+
+OUTPUT_FILE = Path("news_feed.txt")
+WORD_COUNT_CSV = Path("word_count.csv")
+WORD_NGRAM_CSV = Path("word_ngrams.csv")
+LETTER_STATS_CSV = Path("letter_stats.csv")
+STATS_STATE_FILE = Path("feed_stats.json")
+
+WORD_PATTERN = re.compile(r"\b\w+\b")
+
+
+# ----------------------------
+# COUNTING HELPERS
+# ----------------------------
+
+def count_words(text: str) -> Counter:
+    """Count lowercase words in a chunk of feed text."""
+    return Counter(WORD_PATTERN.findall(text.lower()))
+
+
+def count_letters(text: str):
+    """Return (all letters, uppercase letters) counters keyed by lowercase letter."""
+    total_counts = Counter(ch.lower() for ch in text if ch.isalpha())
+    upper_counts = Counter(ch.lower() for ch in text if ch.isupper())
+    return total_counts, upper_counts
+
+
+# ----------------------------
+# APPROXIMATE WORD STATISTICS
+# ----------------------------
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary: at most ``capacity`` counters for any number of items.
+
+    A tracked item's count never underestimates its true count and overestimates it
+    by at most ``errors[item]``, which is bounded by total / capacity.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []   # (count, item); entries may be stale (lower than the current count)
+
+    def update(self, item, weight: int = 1):
+        self.total += weight
+        counts = self.counts
+        if item in counts:
+            counts[item] += weight
+            return
+        floor = 0
+        if len(counts) >= self.capacity:
+            floor, victim = self._pop_min()
+            del counts[victim], self.errors[victim]
+        counts[item] = floor + weight
+        self.errors[item] = floor
+        heapq.heappush(self._heap, (counts[item], item))
+
+    def update_counts(self, counter):
+        for item, weight in counter.items():
+            self.update(item, weight)
+
+    def _pop_min(self):
+        heap, counts = self._heap, self.counts
+        while True:
+            count, item = heapq.heappop(heap)
+            current = counts[item]
+            if current == count:
+                return count, item
+            heapq.heappush(heap, (current, item))
+
+    def top(self, n: int = None) -> list:
+        """(item, count) pairs with the highest counts, most frequent first, ties by item."""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked if n is None else ranked[:n]
+
+    def error_bound(self) -> int:
+        """The most any reported count can exceed the true count."""
+        return max(self.errors.values(), default=0)
+
+    def to_state(self) -> dict:
+        return {"capacity": self.capacity, "total": self.total, "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        summary = cls(state["capacity"])
+        summary.total = state["total"]
+        summary.counts = dict(state["counts"])
+        summary.errors = dict(state["errors"])
+        summary._heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class ApproximateWordStats:
+    """Bounded-memory word and word n-gram statistics for feeds with huge vocabularies.
+
+    Words and ``ngram``-word sequences (within one line) go into Space-Saving
+    summaries of ceil(1 / error) counters each, so reported counts overestimate by at
+    most ``error`` times the number of tokens seen. Reports list the ``top_n`` most
+    frequent entries instead of the whole vocabulary.
+    """
+
+    def __init__(self, top_n: int = 1000, error: float = 1e-4, ngram: int = 2, ngram_csv=WORD_NGRAM_CSV):
+        self.top_n = top_n
+        self.error = error
+        self.ngram = ngram
+        self.ngram_csv = Path(ngram_csv)
+        self.reset()
+
+    def reset(self):
+        capacity = max(self.top_n, math.ceil(1 / self.error))
+        self.words = SpaceSaving(capacity)
+        self.ngrams = SpaceSaving(capacity)
+
+    def add_text(self, text: str):
+        words, ngrams, n = Counter(), Counter(), self.ngram
+        for line in text.lower().splitlines():
+            tokens = WORD_PATTERN.findall(line)
+            words.update(tokens)
+            if n > 1:
+                ngrams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        self.words.update_counts(words)
+        self.ngrams.update_counts(ngrams)
+
+    def merge_state(self, state: dict):
+        """Fold a saved summary (e.g. of a closed feed segment) into this one."""
+        for name in ("words", "ngrams"):
+            getattr(self, name).update_counts(state[name]["counts"])
+
+    def to_state(self) -> dict:
+        return {"words": self.words.to_state(), "ngrams": self.ngrams.to_state()}
+
+    def load_state(self, state: dict):
+        self.words = SpaceSaving.from_state(state["words"])
+        self.ngrams = SpaceSaving.from_state(state["ngrams"])
+
+    def copy(self):
+        clone = ApproximateWordStats(self.top_n, self.error, self.ngram, self.ngram_csv)
+        clone.load_state(json.loads(json.dumps(self.to_state())))
+        return clone
+
+
+# ----------------------------
+# ATOMIC REPORT FILES
+# ----------------------------
+
+class HashingWriter:
+    """File-like wrapper that hashes everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.blake2b(digest_size=16)
+
+    def write(self, text: str):
+        self.hash.update(text.encode("utf-8"))
+        return self.f.write(text)
+
+
+def write_csv_atomic(path: Path, header, rows, previous_hash: str = None) -> str:
+    """Stream rows into a temp file next to ``path`` and rename it into place; returns the content hash.
+
+    Readers see either the old or the new file, never a partial one. When the hash
+    equals ``previous_hash`` and ``path`` exists, ``path`` is left untouched.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        out = HashingWriter(f)
+        writer = csv.writer(out)
+        writer.writerow(header)
+        writer.writerows(rows)
+    digest = out.hash.hexdigest()
+    if digest == previous_hash and path.exists():
+        tmp.unlink()
+    else:
+        os.replace(tmp, path)
+    return digest
+
+
+def write_json_atomic(path: Path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+# ----------------------------
+# INCREMENTAL STATISTICS ENGINE
+# ----------------------------
+
+class StatisticsEngine:
+    """Keeps running word/letter counters for the feed file and folds in only appended text.
+
+    Every record appended to the feed ends with a newline, so words never straddle
+    two appends and the counters are purely additive. The engine remembers the byte
+    offset it has already counted and, on sync, reads just the tail of the feed.
+    With ``segments`` (a FeedSegments) the CSV reports also include the counters of
+    closed feed segments; the engine itself only ever counts the active file.
+
+    State and reports are replaced atomically, and a report whose content hash did
+    not change is not rewritten. With ``min_interval`` set, saving happens at most
+    once per that many seconds; skipped saves are written by ``flush`` (also run at
+    exit) or the next save after the interval.
+
+    With ``approx`` (an ApproximateWordStats) word counts are kept in bounded memory
+    and word_count.csv lists only the most frequent words, by count; letters stay exact.
+    """
+
+    def __init__(self, feed_path=OUTPUT_FILE, word_csv=WORD_COUNT_CSV,
+                 letter_csv=LETTER_STATS_CSV, state_path=STATS_STATE_FILE, segments=None,
+                 min_interval: float = 0.0, approx: ApproximateWordStats = None):
+        self.feed_path = Path(feed_path)
+        self.segments = segments
+        self.min_interval = min_interval
+        self.approx = approx
+        self.word_csv = Path(word_csv)
+        self.letter_csv = Path(letter_csv)
+        self.state_path = Path(state_path)
+        self.offset = 0
+        self.words = Counter()
+        self.letters = Counter()
+        self.uppercase = Counter()
+        self.csv_hashes = {}
+        self._loaded = False
+        self._dirty = False
+        self._last_save = None
+        if min_interval:
+            atexit.register(self.flush)
+
+    def load(self):
+        """Load persisted counters; a missing or corrupt state file means starting from zero."""
+        self._loaded = True
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.offset = int(state["offset"])
+            self.words = Counter(state["words"])
+            self.letters = Counter(state["letters"])
+            self.uppercase = Counter(state["uppercase"])
+            self.csv_hashes = state.get("csv_hashes", {})
+            if ("approx" in state) != bool(self.approx):
+                raise KeyError("approx")  # word mode changed: recount
+            if self.approx:
+                self.approx.load_state(state["approx"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.words, self.letters, self.uppercase = Counter(), Counter(), Counter()
+        if self.approx:
+            self.approx.reset()
+
+    def add_text(self, text: str):
+        """Fold a chunk of feed text into the running counters."""
+        if self.approx:
+            self.approx.add_text(text)
+        else:
+            self.words.update(count_words(text))
+        total_counts, upper_counts = count_letters(text)
+        self.letters.update(total_counts)
+        self.uppercase.update(upper_counts)
+
+    def sync(self, force: bool = False) -> bool:
+        """Count whatever was appended to the feed since the last sync and persist the result.
+
+        Falls back to a full rebuild if the feed shrank (truncated or replaced).
+        ``force`` saves even inside the throttle interval.
+        Returns False when there is no feed file yet.
+        """
+        if not self.feed_path.exists():
+            return False
+        if not self._loaded:
+            self.load()
+
+        size = self.feed_path.stat().st_size
+        if size < self.offset:
+            return self.rebuild()
+        if size > self.offset:
+            with open(self.feed_path, "rb") as f:
+                f.seek(self.offset)
+                tail = f.read()
+            self.add_text(tail.decode("utf-8"))
+            self.offset += len(tail)
+        self.save(force)
+        return True
+
+    def rebuild(self) -> bool:
+        """Recount the whole feed from scratch."""
+        self._loaded = True
+        self.reset()
+        return self.sync(force=True)
+
+    def save(self, force: bool = False):
+        """Persist counters and regenerate both CSV reports, unless throttled."""
+        now = time.monotonic()
+        if (not force and self.min_interval and self._last_save is not None
+                and now - self._last_save < self.min_interval):
+            self._dirty = True
+            return
+        self._dirty = False
+        self._last_save = now
+        self.write_csv()
+        write_json_atomic(self.state_path, {
+            "offset": self.offset,
+            "words": self.words,
+            "letters": self.letters,
+            "uppercase": self.uppercase,
+            "csv_hashes": self.csv_hashes,
+            **({"approx": self.approx.to_state()} if self.approx else {}),
+        })
+
+    def flush(self):
+        """Write a save that was skipped by the throttle."""
+        if self._dirty:
+            self.save(force=True)
+
+    def totals(self):
+        """(words, letters, uppercase) for the active feed plus any closed segments."""
+        if not self.segments or not self.segments.segments:
+            return self.words, self.letters, self.uppercase
+        words, letters, uppercase = self.segments.totals()
+        return words + self.words, letters + self.letters, uppercase + self.uppercase
+
+    def segment_state(self) -> dict:
+        """Counters of the active feed, as saved for a closed segment."""
+        state = {"words": self.words, "letters": self.letters, "uppercase": self.uppercase}
+        if self.approx:
+            state["approx"] = self.approx.to_state()
+        return state
+
+    def approx_totals(self) -> ApproximateWordStats:
+        """The approximate summaries merged with those of closed segments."""
+        states = self.segments.approx_states() if self.segments else []
+        if not states:
+            return self.approx
+        merged = self.approx.copy()
+        for state in states:
+            merged.merge_state(state)
+        return merged
+
+    def write_csv(self):
+        words, letters, uppercase = self.totals()
+        if self.approx:
+            approx = self.approx_totals()
+            self.csv_hashes["words"] = write_csv_atomic(
+                self.word_csv, ["word", "count"], approx.words.top(approx.top_n), self.csv_hashes.get("words"))
+            self.csv_hashes["ngrams"] = write_csv_atomic(
+                approx.ngram_csv, ["ngram", "count"], approx.ngrams.top(approx.top_n), self.csv_hashes.get("ngrams"))
+        else:
+            self.csv_hashes["words"] = write_csv_atomic(
+                self.word_csv, ["word", "count"], sorted(words.items()), self.csv_hashes.get("words"))
+        self.csv_hashes["letters"] = write_csv_atomic(
+            self.letter_csv, ["letter", "count_all", "count_uppercase", "percentage"],
+            letter_rows(letters, uppercase), self.csv_hashes.get("letters"))
+
+
+def letter_rows(letters: Counter, uppercase: Counter):
+    """letter_stats.csv rows: letter, count_all, count_uppercase, percentage uppercase."""
+    for letter in sorted(letters.keys()):
+        count_all = letters[letter]
+        count_upper = uppercase.get(letter, 0)
+        percentage = round(count_upper / count_all * 100, 2) if count_all > 0 else 0
+        yield [letter, count_all, count_upper, percentage]
@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+from sqlite_storage import SQLiteStorage, StorageSettings
+from task_10 import DB_FILE, DEFAULT_INPUT_FOLDER, OUTPUT_FILE, PROCESSORS, FeedApp
+
+
+INDEX_FILE = Path("input_index.db")
+
+# A directory whose mtime is this close to "now" may still receive entries within the
+# same timestamp tick, so it is rescanned on the next poll as well.
+RACY_MTIME_NS = 2_000_000_000
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class InputIndex:
+    """Persistent record of input files the watcher has seen: path, size, mtime, hash, status."""
+
+    def __init__(self, index_path=INDEX_FILE, settings: StorageSettings = None):
+        self.storage = SQLiteStorage(index_path, settings)
+        self.storage.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT,
+                status TEXT NOT NULL
+            )
+        """)
+
+    def load(self, folder: Path) -> dict:
+        """Every indexed file under ``folder``: path -> (size, mtime_ns, hash, status)."""
+        rows = self.storage.conn.execute("SELECT path, size, mtime_ns, hash, status FROM files")
+        return {Path(row[0]): row[1:] for row in rows if Path(row[0]).parent == folder}
+
+    def put(self, path: Path, size: int, mtime_ns: int, digest, status: str):
+        self.storage.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash, status) VALUES (?, ?, ?, ?, ?)",
+            (str(path), size, mtime_ns, digest, status)
+        )
+
+    def forget(self, path: Path):
+        self.storage.execute("DELETE FROM files WHERE path=?", (str(path),))
+
+    def close(self):
+        self.storage.close()
+
+
+class InputWatcher:
+    """Polls an input folder and dispatches new or changed files to their InputProcessor.
+
+    The folder is only listed when its own mtime changes (an entry was added, removed
+    or renamed), and a listing only looks at names missing from the in-memory index.
+    Between listings the watcher re-stats just its candidates: new files waiting to be
+    dispatched and files that failed to parse, so a fixed file is picked up again.
+    A file is dispatched once it has not been modified for ``settle`` seconds; a failed
+    file is retried only after its content hash changes.
+    """
+
+    def __init__(self, app: FeedApp, folder: Path = None, index: InputIndex = None,
+                 batch_size: int = None, settle: float = 0.05):
+        self.app = app
+        self.folder = Path(folder or app.input_folder_path)
+        self.index = index or InputIndex()
+        self.batch_size = batch_size
+        self.settle_ns = int(settle * 1e9)
+        self.extensions = {p.extension: p for p in PROCESSORS}
+        self.known = self.index.load(self.folder)
+        self.candidates = {path: entry[:2] for path, entry in self.known.items()}
+        self._dir_mtime_ns = None
+        self._rescan = True
+
+    def poll(self) -> list:
+        """One watcher tick; returns (path, processed_ok) for every file dispatched."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        dir_mtime_ns = self.folder.stat().st_mtime_ns
+        if self._rescan or dir_mtime_ns != self._dir_mtime_ns:
+            self._scan()
+            self._dir_mtime_ns = dir_mtime_ns
+            self._rescan = time.time_ns() - dir_mtime_ns < RACY_MTIME_NS
+
+        dispatched = []
+        for path, previous in list(self.candidates.items()):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                self._forget(path)
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            self.candidates[path] = current
+            if current != previous and time.time_ns() - st.st_mtime_ns < self.settle_ns:
+                continue  # still being written
+            result = self._dispatch(path, *current)
+            if result is not None:
+                dispatched.append((path, result))
+        return dispatched
+
+    def _scan(self):
+        present = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                if path.suffix.lower() not in self.extensions:
+                    continue
+                present.add(path)
+                if path in self.known or not entry.is_file():
+                    continue
+                st = entry.stat()
+                self.known[path] = (st.st_size, st.st_mtime_ns, None, "pending")
+                self.index.put(path, st.st_size, st.st_mtime_ns, None, "pending")
+                self.candidates[path] = (-1, -1)
+        for path in self.known.keys() - present:
+            self._forget(path)
+
+    def _dispatch(self, path: Path, size: int, mtime_ns: int):
+        known = self.known.get(path)
+        if known and known[3] == "failed":
+            if known[:2] == (size, mtime_ns):
+                return None  # broken file, untouched since it failed
+            digest = file_digest(path)
+            if digest == known[2]:
+                self._remember(path, size, mtime_ns, digest, "failed")
+                return None  # touched but content unchanged
+        else:
+            digest = None
+
+        processor = self.extensions[path.suffix.lower()]
+        ok = processor(path, batch=True, batch_size=self.batch_size, app=self.app).process_file()
+        if ok:
+            self._forget(path)
+        else:
+            self._remember(path, size, mtime_ns, digest or file_digest(path), "failed")
+        return ok
+
+    def _remember(self, path, size, mtime_ns, digest, status):
+        self.known[path] = (size, mtime_ns, digest, status)
+        self.index.put(path, size, mtime_ns, digest, status)
+
+    def _forget(self, path: Path):
+        self.known.pop(path, None)
+        self.candidates.pop(path, None)
+        self.index.forget(path)
+
+    def run(self, poll_interval: float = 0.2, max_polls: int = None):
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            self.poll()
+            polls += 1
+            time.sleep(poll_interval)
+
+    def close(self):
+        self.index.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Watch the input folder and ingest new or changed files.")
+    parser.add_argument("folder", type=Path, nargs="?", default=DEFAULT_INPUT_FOLDER)
+    parser.add_argument("--feed", type=Path, default=OUTPUT_FILE)
+    parser.add_argument("--db", type=Path, default=DB_FILE)
+    parser.add_argument("--index", type=Path, default=INDEX_FILE, help="persistent file index")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between polls")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    app = FeedApp(output_file=args.feed, input_folder=args.folder, db_path=args.db)
+    watcher = InputWatcher(app, index=InputIndex(args.index), batch_size=args.batch_size)
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        app.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
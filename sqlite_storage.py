@@ -0,0 +1,211 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+class StorageSettings:
+    """Connection tuning for SQLite databases used by the feed and the city tools.
+
+    ``commit_every`` / ``commit_interval_ms`` enable a durability window: writes are
+    group-committed once N writes are pending or the oldest pending write is T ms old
+    (checked on the next write, and on flush/close/exit). Leaving both as None keeps
+    one commit per write.
+    """
+
+    def __init__(self, journal_mode: str = "WAL", synchronous: str = "NORMAL",
+                 cache_size: int = -16000, mmap_size: int = 64 * 1024 * 1024,
+                 statement_cache: int = 128, busy_timeout_ms: int = 5000,
+                 commit_every: int = None, commit_interval_ms: int = None):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size          # pages, or KiB when negative (SQLite convention)
+        self.mmap_size = mmap_size            # bytes; 0 disables memory-mapped I/O
+        self.statement_cache = statement_cache
+        self.busy_timeout_ms = busy_timeout_ms
+        self.commit_every = commit_every
+        self.commit_interval_ms = commit_interval_ms
+
+    @property
+    def group_commit(self) -> bool:
+        return bool(self.commit_every or self.commit_interval_ms)
+
+
+def connect(db_path, settings: StorageSettings = None, **kwargs) -> sqlite3.Connection:
+    """Open an autocommit connection with the given pragmas applied."""
+    settings = settings or StorageSettings()
+    conn = sqlite3.connect(db_path, isolation_level=None,
+                           cached_statements=settings.statement_cache, **kwargs)
+    conn.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+    conn.execute(f"PRAGMA synchronous={settings.synchronous}")
+    conn.execute(f"PRAGMA cache_size={int(settings.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size={int(settings.mmap_size)}")
+    conn.execute(f"PRAGMA busy_timeout={int(settings.busy_timeout_ms)}")
+    return conn
+
+
+class SQLiteStorage:
+    """A tuned SQLite connection with explicit transactions and optional group commit.
+
+    Writes go through ``transaction()``. Each transaction is a savepoint inside the
+    currently open durability window, so a failing write is rolled back on its own
+    without discarding other pending writes.
+    """
+
+    def __init__(self, db_path, settings: StorageSettings = None, flush_at_exit: bool = True):
+        self.settings = settings or StorageSettings()
+        self.conn = connect(db_path, self.settings)
+        self.pending = 0
+        self.window_started = None
+        self.flush_at_exit = flush_at_exit and self.settings.group_commit
+        if self.flush_at_exit:
+            atexit.register(self.flush)
+
+    @contextmanager
+    def transaction(self, writes: int = 1):
+        """Run a group of statements atomically; yields the connection."""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+            self.window_started = time.monotonic()
+        self.conn.execute("SAVEPOINT write")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK TO write")
+            self.conn.execute("RELEASE write")
+            if not self.pending:
+                self.conn.execute("ROLLBACK")
+                self.window_started = None
+            raise
+        self.conn.execute("RELEASE write")
+        self.pending += writes
+        if self._window_closed():
+            self.flush()
+
+    def execute(self, sql, params=()):
+        """Execute a single write statement."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        rows = list(rows)
+        with self.transaction(len(rows)) as conn:
+            return conn.executemany(sql, rows)
+
+    def _window_closed(self) -> bool:
+        settings = self.settings
+        if not settings.group_commit:
+            return True
+        if settings.commit_every and self.pending >= settings.commit_every:
+            return True
+        if settings.commit_interval_ms is not None:
+            return (time.monotonic() - self.window_started) * 1000 >= settings.commit_interval_ms
+        return False
+
+    def flush(self):
+        """Commit everything written in the current durability window."""
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+        self.pending = 0
+        self.window_started = None
+
+    def close(self):
+        self.flush()
+        if self.flush_at_exit:
+            atexit.unregister(self.flush)
+        self.conn.close()
+
+
+class ConnectionPool:
+    """Thread-safe access to one database: per-thread readers and a single writer thread.
+
+    Reads use a connection private to the calling thread (WAL lets them run while the
+    writer commits). Writes are callables ``fn(storage)`` queued to one writer thread
+    that owns the SQLiteStorage, so concurrent publishers never contend for the write
+    lock. ``submit`` returns a concurrent.futures.Future, which asyncio code can await
+    with ``asyncio.wrap_future``.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path, settings: StorageSettings = None, max_pending: int = 0):
+        self.db_path = db_path
+        self.settings = settings or StorageSettings()
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(max_pending)
+        ready = Future()
+        self._writer = threading.Thread(target=self._run_writer, args=(ready,),
+                                        name="sqlite-writer", daemon=True)
+        self._writer.start()
+        ready.result()  # re-raises if the database could not be opened
+        atexit.register(self.close)
+
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path, self.settings, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def submit(self, fn) -> Future:
+        """Queue ``fn(storage)`` for the writer thread; blocks while the queue is full."""
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def write(self, fn):
+        """Run ``fn(storage)`` on the writer thread and wait for its result."""
+        if threading.current_thread() is self._writer:
+            return fn(self._storage)
+        return self.submit(fn).result()
+
+    def _run_writer(self, ready):
+        try:
+            self._storage = SQLiteStorage(self.db_path, self.settings, flush_at_exit=False)
+        except BaseException as exc:
+            ready.set_exception(exc)
+            return
+        ready.set_result(None)
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self._idle_timeout())
+            except queue.Empty:
+                self._storage.flush()  # durability window expired while idle
+                continue
+            if item is self._STOP:
+                break
+            fn, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(self._storage))
+            except BaseException as exc:
+                future.set_exception(exc)
+        self._storage.close()
+
+    def _idle_timeout(self):
+        interval = self.settings.commit_interval_ms
+        if self._storage.pending and interval is not None:
+            return interval / 1000
+        return None
+
+    def close(self):
+        """Finish queued writes, commit, and close every connection."""
+        atexit.unregister(self.close)
+        if not self._writer.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._writer.join()
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
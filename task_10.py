@@ -1,35 +1,163 @@
+import argparse
 import datetime
-import csv
+import hashlib
 import os
-import re
-import json
 import sqlite3
+import sys
+import json
 import xml.etree.ElementTree as ET
-from collections import Counter
 from pathlib import Path
 
+from feed_index import FEED_INDEX_FILE, FeedIndex
+from feed_segments import FeedSegments, SegmentSettings
+from feed_snapshot import SNAPSHOT_DIR, SnapshotWriter
+from feed_stats import ApproximateWordStats, StatisticsEngine
+from sqlite_storage import ConnectionPool, SQLiteStorage, StorageSettings
+from text_utils import normalize_case, normalize_field
+
 
 OUTPUT_FILE = Path("news_feed.txt")
 DEFAULT_INPUT_FOLDER = Path("input_files")
 WORD_COUNT_CSV = Path("word_count.csv")
 LETTER_STATS_CSV = Path("letter_stats.csv")
+STATS_STATE_FILE = Path("feed_stats.json")
 DB_FILE = Path("news_feed.db")
 
+SCHEMA_VERSION = 2
+
+# table -> (inserted columns, columns covered by the UNIQUE duplicate index)
+TABLE_COLUMNS = {
+    "news": (("text", "city", "date"), ("text", "city", "date")),
+    "ads": (("text", "expiration_date", "days_left"), ("text", "expiration_date")),
+    "quotes": (("quote", "author", "weekday"), ("quote", "author")),
+}
+
+# table -> (text column, place column, code); search_index rowid = id * 4 + code
+SEARCH_COLUMNS = {
+    "news": ("text", "city", 1),
+    "ads": ("text", "expiration_date", 2),
+    "quotes": ("quote", "author", 3),
+}
+
 
 # ----------------------------
 # DATABASE MANAGER
 # ----------------------------
 
-class DatabaseManager:
-    """Manages SQLite database tables and inserts records without duplicates."""
+class DuplicateFilter:
+    """Bounded in-memory set of record hashes for skipping duplicates before SQLite.
+
+    Keys are 64-bit BLAKE2b digests of (table, duplicate-key fields). A hit is treated
+    as a duplicate, which is wrong only on a hash collision (see false_positive_rate);
+    a miss, or anything arriving after the filter is full, goes to the database.
+    """
+
+    def __init__(self, capacity: int = 1_000_000):
+        self.capacity = capacity
+        self.hashes = set()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(table, values) -> int:
+        payload = "\x1f".join(repr(v) for v in (table, *values)).encode("utf-8")
+        return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "big")
+
+    def check_and_add(self, table, values) -> bool:
+        """Return True if the record was already seen; otherwise remember it (if there is room)."""
+        key = self.key(table, values)
+        if key in self.hashes:
+            self.hits += 1
+            return True
+        self.misses += 1
+        if len(self.hashes) < self.capacity:
+            self.hashes.add(key)
+        return False
+
+    def false_positive_rate(self) -> float:
+        """Probability that a new record collides with a stored hash and is wrongly skipped."""
+        return len(self.hashes) / 2 ** 64
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: the set's table plus one int object per stored hash."""
+        return sys.getsizeof(self.hashes) + len(self.hashes) * sys.getsizeof(2 ** 63)
+
+
+class Checkpoint:
+    """How far an input file has been ingested, saved with each committed batch.
+
+    ``position`` is a byte offset into TXT files and a count of records read for
+    JSON/XML. ``feed_end`` is the feed file size once the batch is appended and
+    ``tail`` the batch's feed text, so an append lost in a crash can be redone.
+    A checkpoint only applies while the file's size and mtime are unchanged.
+    """
+
+    def __init__(self, path, size: int, mtime_ns: int, position: int = 0, feed_end: int = 0, tail: str = ""):
+        self.path = str(path)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.position = position
+        self.feed_end = feed_end
+        self.tail = tail
+
+    @staticmethod
+    def key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    @classmethod
+    def for_file(cls, path: Path):
+        st = Path(path).stat()
+        return cls(cls.key(path), st.st_size, st.st_mtime_ns)
+
+    def matches(self, other) -> bool:
+        return other is not None and (self.path, self.size, self.mtime_ns) == (other.path, other.size, other.mtime_ns)
+
+    def row(self):
+        return self.path, self.size, self.mtime_ns, self.position, self.feed_end, self.tail
 
-    def __init__(self, db_path=DB_FILE):
-        self.conn = sqlite3.connect(db_path)
+
+class DatabaseManager:
+    """Manages SQLite database tables and inserts records without duplicates.
+
+    With ``dedupe_filter`` enabled, a DuplicateFilter is preloaded from the existing
+    rows and known duplicates are skipped without a database round trip. ``settings``
+    controls journaling, caching and the group-commit window (see StorageSettings).
+    With ``threaded`` enabled the manager may be shared by many threads: writes are
+    serialized through a ConnectionPool writer thread and reads use per-thread
+    connections.
+    """
+
+    def __init__(self, db_path=DB_FILE, dedupe_filter: bool = False, filter_capacity: int = 1_000_000,
+                 settings: StorageSettings = None, threaded: bool = False):
+        self.pool = ConnectionPool(db_path, settings) if threaded else None
+        self.storage = None if threaded else SQLiteStorage(db_path, settings)
+        self.conn = None if threaded else self.storage.conn
+        self.insert_statements = {table: self._insert_sql(table) for table in TABLE_COLUMNS}
         self.create_tables()
+        self.filter = DuplicateFilter(filter_capacity) if dedupe_filter else None
+        if self.filter:
+            self.load_filter()
+
+    def write(self, fn):
+        """Run ``fn(storage)`` on the writing connection and return its result."""
+        return self.pool.write(fn) if self.pool else fn(self.storage)
+
+    def reader(self):
+        """A connection the calling thread may read from."""
+        return self.pool.reader() if self.pool else self.conn
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+        else:
+            self.storage.close()
 
     def create_tables(self):
-        with self.conn:
-            self.conn.execute("""
+        self.write(self._create_tables)
+
+    def _create_tables(self, storage):
+        with storage.transaction() as conn:
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS news (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     text TEXT NOT NULL,
@@ -37,7 +165,7 @@ class DatabaseManager:
                     date TEXT
                 )
             """)
-            self.conn.execute("""
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS ads (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     text TEXT NOT NULL,
@@ -45,7 +173,7 @@ class DatabaseManager:
                     days_left INTEGER
                 )
             """)
-            self.conn.execute("""
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS quotes (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     quote TEXT NOT NULL,
@@ -53,76 +181,402 @@ class DatabaseManager:
                     weekday TEXT
                 )
             """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    feed_end INTEGER NOT NULL,
+                    tail TEXT NOT NULL
+                )
+            """)
+        self._migrate(storage)
+        storage.flush()  # schema changes are never left in a durability window
+
+    def migrate(self):
+        """Bring an existing database up to SCHEMA_VERSION.
+
+        Version 1 adds a UNIQUE index over each table's duplicate key so inserts can
+        rely on INSERT OR IGNORE; duplicates already stored are dropped first, keeping
+        the oldest row. Version 2 adds the FTS5 search_index, kept up to date by
+        triggers and filled from the existing rows; it is skipped (and retried on the
+        next start) when this SQLite build has no FTS5.
+        """
+        self.write(self._migrate)
+
+    def _migrate(self, storage):
+        version = storage.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            with storage.transaction() as conn:
+                for table, (_, key) in TABLE_COLUMNS.items():
+                    key_list = ", ".join(key)
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE id NOT IN "
+                        f"(SELECT MIN(id) FROM {table} GROUP BY {key_list})"
+                    )
+                    conn.execute(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_unique ON {table} ({key_list})"
+                    )
+                conn.execute("PRAGMA user_version = 1")
+        if version < 2:
+            try:
+                with storage.transaction() as conn:
+                    self._create_search_index(conn)
+                    conn.execute("PRAGMA user_version = 2")
+            except sqlite3.OperationalError as exc:
+                if "fts5" not in str(exc):
+                    raise
+                print("⚠️ SQLite has no FTS5 support; search falls back to LIKE scans.")
+
+    @staticmethod
+    def _create_search_index(conn):
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                text, place, kind UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        for table, (text, place, code) in SEARCH_COLUMNS.items():
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+                    INSERT INTO search_index (rowid, text, place, kind)
+                    VALUES (new.id * 4 + {code}, new.{text}, new.{place}, '{table}');
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+                    DELETE FROM search_index WHERE rowid = old.id * 4 + {code};
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN
+                    UPDATE search_index SET text = new.{text}, place = new.{place}
+                    WHERE rowid = old.id * 4 + {code};
+                END
+            """)
+            conn.execute(f"""
+                INSERT INTO search_index (rowid, text, place, kind)
+                SELECT id * 4 + {code}, {text}, {place}, '{table}' FROM {table}
+            """)
+
+    def load_filter(self):
+        """Fill the duplicate filter with the keys of rows already stored."""
+        conn = self.reader()
+        for table, (_, key) in TABLE_COLUMNS.items():
+            for values in conn.execute(f"SELECT {', '.join(key)} FROM {table}"):
+                if len(self.filter.hashes) >= self.filter.capacity:
+                    return
+                self.filter.hashes.add(self.filter.key(table, values))
 
     def insert_news(self, text, city, date):
-        if not self._exists("news", "text=? AND city=? AND date=?", (text, city, date)):
-            with self.conn:
-                self.conn.execute(
-                    "INSERT INTO news (text, city, date) VALUES (?, ?, ?)",
-                    (text, city, date)
-                )
+        self._insert("news", (text, city, date))
 
     def insert_ad(self, text, expiration_date, days_left):
-        if not self._exists("ads", "text=? AND expiration_date=?", (text, expiration_date)):
-            with self.conn:
-                self.conn.execute(
-                    "INSERT INTO ads (text, expiration_date, days_left) VALUES (?, ?, ?)",
-                    (text, expiration_date, days_left)
-                )
+        self._insert("ads", (text, expiration_date, days_left))
 
     def insert_quote(self, quote, author, weekday):
-        if not self._exists("quotes", "quote=? AND author=?", (quote, author)):
-            with self.conn:
-                self.conn.execute(
-                    "INSERT INTO quotes (quote, author, weekday) VALUES (?, ?, ?)",
-                    (quote, author, weekday)
-                )
-
-    def _exists(self, table, condition, params):
-        cur = self.conn.cursor()
-        cur.execute(f"SELECT 1 FROM {table} WHERE {condition} LIMIT 1", params)
-        return cur.fetchone() is not None
-
-
-db = DatabaseManager()  # Global database instance
+        self._insert("quotes", (quote, author, weekday))
+
+    def insert_many(self, rows_by_table, checkpoint: "Checkpoint" = None):
+        """Insert rows for several tables with one executemany per table in a single transaction.
+
+        Rows already present in the table (or earlier in the same batch) are skipped.
+        A ``checkpoint`` is saved in the same transaction, which is then committed
+        right away, outside any group-commit window.
+        """
+        def insert(storage):
+            pending = {table: [row for row in rows if not self._known_duplicate(table, row)]
+                       for table, rows in rows_by_table.items()}
+            with storage.transaction(sum(map(len, pending.values()))) as conn:
+                for table, rows in pending.items():
+                    if rows:
+                        conn.executemany(self.insert_statements[table], rows)
+                if checkpoint:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO ingest_checkpoints "
+                        "(path, size, mtime_ns, position, feed_end, tail) VALUES (?, ?, ?, ?, ?, ?)",
+                        checkpoint.row()
+                    )
+            if checkpoint:
+                storage.flush()
+        self.write(insert)
+
+    def search(self, query: str, limit: int = 20, tables=None, raw: bool = False) -> list:
+        """Best matches for ``query`` across news, ads and quotes, ranked by BM25.
+
+        Each result is a dict with table, id, text, place, a highlighted snippet and
+        rank (lower is better). Words in ``query`` are matched as plain terms unless
+        ``raw`` is set, in which case the FTS5 query syntax (OR, NEAR, prefix*) applies.
+        """
+        tables = list(tables or SEARCH_COLUMNS)
+        conn = self.reader()
+        if not raw:
+            query = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not query:
+            return []
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name='search_index'").fetchone():
+            return self._search_like(conn, query, limit, tables)
+        rows = conn.execute(f"""
+            SELECT kind, rowid / 4, text, place,
+                   snippet(search_index, 0, '[', ']', '…', 12), bm25(search_index) AS rank
+            FROM search_index
+            WHERE search_index MATCH ? AND kind IN ({', '.join('?' * len(tables))})
+            ORDER BY rank
+            LIMIT ?
+        """, (query, *tables, limit))
+        return [dict(zip(("table", "id", "text", "place", "snippet", "rank"), row)) for row in rows]
+
+    @staticmethod
+    def _search_like(conn, query, limit, tables):
+        terms = [term.strip('"').replace('""', '"') for term in query.split()]
+        results = []
+        for table in tables:
+            text, place, _ = SEARCH_COLUMNS[table]
+            where = " AND ".join(f"({text} LIKE ? OR {place} LIKE ?)" for _ in terms)
+            params = [f"%{term}%" for term in terms for _ in (text, place)]
+            for row_id, body, where_ in conn.execute(
+                    f"SELECT id, {text}, {place} FROM {table} WHERE {where} LIMIT ?", (*params, limit)):
+                results.append({"table": table, "id": row_id, "text": body, "place": where_,
+                                "snippet": body, "rank": 0.0})
+        return results[:limit]
+
+    def load_checkpoint(self, path: Path):
+        """The saved Checkpoint of an input file, or None if there is none."""
+        row = self.reader().execute(
+            "SELECT path, size, mtime_ns, position, feed_end, tail FROM ingest_checkpoints WHERE path=?",
+            (Checkpoint.key(path),)
+        ).fetchone()
+        return Checkpoint(*row) if row else None
+
+    def clear_checkpoint(self, path: Path):
+        def clear(storage):
+            storage.execute("DELETE FROM ingest_checkpoints WHERE path=?", (Checkpoint.key(path),))
+            storage.flush()
+        self.write(clear)
+
+    def _insert(self, table, row):
+        def insert(storage):
+            if not self._known_duplicate(table, row):
+                storage.execute(self.insert_statements[table], row)
+        self.write(insert)
+
+    def _known_duplicate(self, table, row) -> bool:
+        # Called on the writing connection's thread only, so the filter needs no lock.
+        if not self.filter:
+            return False
+        columns, key = TABLE_COLUMNS[table]
+        return self.filter.check_and_add(table, tuple(row[columns.index(col)] for col in key))
+
+    @staticmethod
+    def _insert_sql(table):
+        columns, _ = TABLE_COLUMNS[table]
+        return (f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})")
 
 
 # ----------------------------
-# CASE NORMALIZATION
+# APPLICATION CONTEXT
 # ----------------------------
 
-def normalize_case(text: str) -> str:
-    """Normalize case: capitalize sentence starts, lower the rest."""
-    result, capitalize_next = "", True
-    for ch in text:
-        if capitalize_next and ch.isalpha():
-            result += ch.upper()
-            capitalize_next = False
-        else:
-            result += ch.lower()
-        if ch in ".!?":
-            capitalize_next = True
-    return result
+class FeedApp:
+    """One news feed instance: its file locations plus a database and statistics opened on first use.
+
+    Nothing touches the disk until ``db``, ``stats`` or ``input_folder()`` is used, so
+    importing this module is free of I/O and several feeds pointed at different stores
+    can live in one process. ``snapshot_dir=None`` / ``index_path=None`` turn off the
+    columnar snapshot and the offset index; ``segments`` (SegmentSettings) turns on
+    rotation of the feed file into segments; ``stats_interval`` throttles how often
+    the statistics reports are rewritten and ``approx_words`` (ApproximateWordStats)
+    switches word statistics to bounded-memory top-N mode. Extra keyword arguments
+    go to DatabaseManager.
+    """
+
+    def __init__(self, output_file=OUTPUT_FILE, input_folder=DEFAULT_INPUT_FOLDER,
+                 word_csv=WORD_COUNT_CSV, letter_csv=LETTER_STATS_CSV,
+                 stats_state=STATS_STATE_FILE, db_path=DB_FILE, snapshot_dir=SNAPSHOT_DIR,
+                 index_path=FEED_INDEX_FILE, segments: SegmentSettings = None,
+                 stats_interval: float = 0.0, approx_words: ApproximateWordStats = None, **db_options):
+        self.output_file = Path(output_file)
+        self.input_folder_path = Path(input_folder)
+        self.word_csv = Path(word_csv)
+        self.letter_csv = Path(letter_csv)
+        self.stats_state = Path(stats_state)
+        self.stats_interval = stats_interval
+        self.approx_words = approx_words
+        self.db_path = db_path
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.index_path = Path(index_path) if index_path else None
+        self.segment_settings = segments
+        self.db_options = db_options
+        self._db = None
+        self._stats = None
+        self._snapshot = None
+        self._index = None
+        self._segments = None
+
+    @property
+    def db(self) -> DatabaseManager:
+        if self._db is None:
+            self._db = DatabaseManager(self.db_path, **self.db_options)
+        return self._db
+
+    @property
+    def stats(self) -> StatisticsEngine:
+        if self._stats is None:
+            self._stats = StatisticsEngine(self.output_file, self.word_csv, self.letter_csv, self.stats_state,
+                                           self.segments, self.stats_interval, self.approx_words)
+        return self._stats
+
+    @property
+    def snapshot(self):
+        """SnapshotWriter for the feed, or None if the snapshot is turned off."""
+        if self._snapshot is None and self.snapshot_dir:
+            self._snapshot = SnapshotWriter(self.output_file, self.snapshot_dir)
+        return self._snapshot
+
+    @property
+    def index(self):
+        """FeedIndex of record offsets, or None if the index is turned off."""
+        if self._index is None and self.index_path:
+            self._index = FeedIndex(self.output_file, self.index_path)
+        return self._index
+
+    @property
+    def segments(self):
+        """FeedSegments of the feed, or None if rotation is turned off."""
+        if self._segments is None and self.segment_settings:
+            self._segments = FeedSegments(self.output_file, settings=self.segment_settings)
+        return self._segments
+
+    def input_folder(self) -> Path:
+        """The input folder, created if missing."""
+        self.input_folder_path.mkdir(parents=True, exist_ok=True)
+        return self.input_folder_path
+
+    def close(self):
+        if self._stats is not None:
+            self._stats.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+
+_app = None
+
+
+def get_app() -> FeedApp:
+    """The default feed used when no app is passed explicitly; created on first use."""
+    global _app
+    if _app is None:
+        _app = FeedApp()
+    return _app
+
+
+def set_app(app: FeedApp):
+    """Replace the default feed (e.g. to point the module-level helpers at another store)."""
+    global _app
+    _app = app
 
 
 # ----------------------------
 # RECORD FORMATTERS
 # ----------------------------
 
-def append_to_file(record: str):
-    """Append a formatted record to the output file and regenerate statistics."""
-    with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
+def append_to_file(record: str, app: FeedApp = None):
+    """Append a formatted record to the output file and update statistics."""
+    app = app or get_app()
+    with open(app.output_file, "a", encoding="utf-8") as f:
         f.write(record + "\n" + "-" * 40 + "\n")
-    recreate_statistics()
+    update_statistics(app)
+
+
+class FeedBatch:
+    """Collects formatted records and DB rows so a whole input file is published at once.
+
+    Pass it to the formatters as ``sink`` instead of the database, then call ``commit``:
+    the feed gets one buffered write, the DB one transaction, the statistics one refresh.
+    """
+
+    def __init__(self, app: FeedApp = None):
+        self.app = app or get_app()
+        self.records = []
+        self.rows = {table: [] for table in TABLE_COLUMNS}
+
+    def insert_news(self, text, city, date):
+        self.rows["news"].append((text, city, date))
 
+    def insert_ad(self, text, expiration_date, days_left):
+        self.rows["ads"].append((text, expiration_date, days_left))
 
-def format_news(text: str, city: str) -> str:
+    def insert_quote(self, quote, author, weekday):
+        self.rows["quotes"].append((quote, author, weekday))
+
+    def append(self, record: str):
+        self.records.append(record)
+
+    def commit(self, checkpoint: Checkpoint = None):
+        """Publish the collected records; ``checkpoint`` is saved atomically with the DB rows."""
+        text = "".join(record + "\n" + "-" * 40 + "\n" for record in self.records)
+        data = text.replace("\n", os.linesep).encode("utf-8")  # what text-mode "a" would write
+        if checkpoint:
+            checkpoint.feed_end = feed_size(self.app) + len(data)
+            checkpoint.tail = text
+        self.app.db.insert_many(self.rows, checkpoint)
+        if self.records:
+            with open(self.app.output_file, "ab") as f:
+                f.write(data)
+            update_statistics(self.app)
+        self.records = []
+        self.rows = {table: [] for table in TABLE_COLUMNS}
+
+
+def feed_size(app: FeedApp = None) -> int:
+    try:
+        return (app or get_app()).output_file.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def resume_point(path: Path, app: FeedApp = None) -> Checkpoint:
+    """Where to start ingesting ``path``: its saved checkpoint if the file is unchanged, else the start."""
+    app = app or get_app()
+    current = Checkpoint.for_file(path)
+    saved = app.db.load_checkpoint(path)
+    if not current.matches(saved):
+        return current
+    restore_feed_tail(saved, app)
+    print(f"⚠️ Resuming {path} from checkpoint {saved.position}")
+    return saved
+
+
+def restore_feed_tail(checkpoint: Checkpoint, app: FeedApp = None):
+    """Redo the feed append of a checkpointed batch if a crash cut it short."""
+    app = app or get_app()
+    data = checkpoint.tail.replace("\n", os.linesep).encode("utf-8")
+    start = checkpoint.feed_end - len(data)
+    size = feed_size(app)
+    if not data or size >= checkpoint.feed_end or size < start:
+        return
+    with open(app.output_file, "r+b" if app.output_file.exists() else "wb") as f:
+        f.truncate(start)
+        f.seek(start)
+        f.write(data)
+    print(f"⚠️ Restored {len(data) - (size - start)} bytes of interrupted feed output")
+    update_statistics(app)
+
+
+def format_news(text: str, city: str, sink=None, normalized: bool = False) -> str:
     date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    db.insert_news(normalize_case(text), city, date)
-    return f"NEWS -------------------------\n{normalize_case(text)}\nCity: {city}, {date}"
+    if not normalized:
+        text = normalize_case(text)
+    (sink or get_app().db).insert_news(text, city, date)
+    return f"NEWS -------------------------\n{text}\nCity: {city}, {date}"
 
 
-def format_private_ad(text: str, expiration_date: str) -> str:
+def format_private_ad(text: str, expiration_date: str, sink=None, normalized: bool = False) -> str:
     try:
         exp_date = datetime.datetime.strptime(expiration_date, "%Y-%m-%d").date()
         days_left = (exp_date - datetime.date.today()).days
@@ -130,183 +584,416 @@ def format_private_ad(text: str, expiration_date: str) -> str:
     except ValueError:
         days_left, days_left_text = None, "Invalid date format"
 
-    db.insert_ad(normalize_case(text), expiration_date, days_left)
-    return f"PRIVATE AD -------------------\n{normalize_case(text)}\nExpires: {expiration_date} ({days_left_text})"
+    if not normalized:
+        text = normalize_case(text)
+    (sink or get_app().db).insert_ad(text, expiration_date, days_left)
+    return f"PRIVATE AD -------------------\n{text}\nExpires: {expiration_date} ({days_left_text})"
 
 
-def format_quote(quote: str, author: str) -> str:
+def format_quote(quote: str, author: str, sink=None, normalized: bool = False) -> str:
     weekday = datetime.datetime.now().strftime("%A")
-    db.insert_quote(normalize_case(quote), normalize_case(author), weekday)
-    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_case(author)}, shared on {weekday}"
+    if not normalized:
+        quote, author = normalize_case(quote), normalize_field(author)
+    (sink or get_app().db).insert_quote(quote, author, weekday)
+    return f"QUOTE OF THE DAY ------------\n\"{quote}\"\n— {author}, shared on {weekday}"
 
 
 # ----------------------------
-# FILE INPUT PROCESSORS
+# FILE INPUT READERS
 # ----------------------------
 
-class FileInputProcessor:
-    """Processes records from TXT file, using <TYPE>::<field1>::<field2> format."""
+# record type -> required fields, in formatter argument order
+RECORD_FIELDS = {
+    "NEWS": ("text", "city"),
+    "AD": ("text", "expiration_date"),
+    "QUOTE": ("quote", "author"),
+}
+
+# how the formatters normalize each field; short repeated fields use the cached variant
+FIELD_NORMALIZERS = {"text": normalize_case, "quote": normalize_case, "author": normalize_field}
+
+
+def iter_txt_records(path: Path):
+    """Yield records from a <TYPE>::<field1>::<field2> file one line at a time."""
+    for _, record in iter_txt_positions(path):
+        yield record
+
+
+def iter_txt_positions(path: Path, start: int = 0):
+    """Yield (byte offset after the record, record) pairs, starting at byte ``start``.
+
+    Reads bytes so offsets can be seeked to; a lone CR ends a line as in text mode.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        end = start
+        for raw in f:
+            pos, end = end, end + len(raw)
+            for piece in raw.split(b"\r"):
+                pos = min(pos + len(piece) + 1, end)
+                line = piece.decode("utf-8").strip()
+                if not line:
+                    continue
+                parts = line.split("::")
+                if len(parts) < 2:
+                    print(f"⚠️ Skipping malformed line: {line}")
+                    continue
+
+                record_type = parts[0].upper()
+                fields = RECORD_FIELDS.get(record_type)
+                if fields and len(parts) == 3:
+                    yield pos, {"type": record_type, **dict(zip(fields, parts[1:]))}
+                else:
+                    print(f"⚠️ Unknown or malformed record: {line}")
+
+
+def iter_json_records(path: Path, chunk_size: int = 1 << 16):
+    """Yield the items of a top-level JSON array without loading the whole document.
+
+    A single top-level object is yielded as one record. Raises json.JSONDecodeError
+    on malformed input, possibly after some records have already been yielded.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, eof = f.read(chunk_size).lstrip(), False
+        if not buf.startswith("["):
+            yield json.loads(buf + f.read())
+            return
+
+        def fill(pos):
+            nonlocal buf, eof
+            chunk = f.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            return 0
+
+        def skip_ws(pos):
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return pos
+                pos = fill(pos)
+
+        pos = skip_ws(1)
+        if buf[pos:pos + 1] == "]":
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                pos = fill(pos)
+                continue
+            yield item
+
+            pos = skip_ws(end)
+            sep = buf[pos:pos + 1]
+            if sep == "]":
+                return
+            if sep != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos = skip_ws(pos + 1)
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
+
+
+def iter_xml_records(path: Path):
+    """Yield <record> children of the root one at a time, clearing parsed elements as we go."""
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    depth = 1
+    for event, elem in context:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and elem.tag == "record":
+            yield {child.tag: child.text for child in elem if child.text}
+            root.clear()
+
+
+# ----------------------------
+# FILE INPUT PROCESSORS
+# ----------------------------
 
-    def __init__(self, file_path: Path = None):
+def validate_record(record):
+    """Return the upper-cased record type if all its required fields are present, else None."""
+    if not isinstance(record, dict):
+        return None
+    record_type = str(record.get("type", "")).upper()
+    fields = RECORD_FIELDS.get(record_type)
+    if not fields or any(field not in record for field in fields):
+        return None
+    return record_type
+
+
+def normalize_record(record):
+    """Return a copy of a valid record with its text fields case-normalized, or None."""
+    record_type = validate_record(record)
+    if record_type is None:
+        return None
+    normalized = {"type": record_type}
+    for field in RECORD_FIELDS[record_type]:
+        normalizer = FIELD_NORMALIZERS.get(field)
+        normalized[field] = normalizer(record[field]) if normalizer else record[field]
+    return normalized
+
+
+def publish_record(record, batch=None, normalized: bool = False, app: FeedApp = None) -> bool:
+    """Format and publish one parsed record; returns False if it is malformed.
+
+    Pass ``normalized=True`` for records that already went through normalize_record.
+    """
+    record_type = validate_record(record)
+    if record_type is None:
+        return False
+
+    app = app or get_app()
+    formatter = {"NEWS": format_news, "AD": format_private_ad, "QUOTE": format_quote}[record_type]
+    formatted = formatter(*(record[field] for field in RECORD_FIELDS[record_type]),
+                          sink=batch or app.db, normalized=normalized)
+    if batch:
+        batch.append(formatted)
+    else:
+        append_to_file(formatted, app)
+    return True
+
+
+class InputProcessor:
+    """Base processor: streams records from one input file and publishes them.
+
+    With ``batch`` enabled records are committed every ``batch_size`` records (or once
+    per file when ``batch_size`` is None), otherwise one by one. Every commit saves a
+    Checkpoint, so a run interrupted halfway resumes after the last committed record.
+    """
+
+    extension = ""
+    label = ""
+    parse_errors = ()
+    reader = None
+
+    def __init__(self, file_path: Path = None, batch: bool = False, batch_size: int = None,
+                 app: FeedApp = None):
+        self.app = app or get_app()
         self.file_path = file_path or self.get_default_file()
+        self.batch = batch
+        self.batch_size = batch_size
 
     def get_default_file(self) -> Path:
-        if not DEFAULT_INPUT_FOLDER.exists():
-            DEFAULT_INPUT_FOLDER.mkdir()
-        files = list(DEFAULT_INPUT_FOLDER.glob("*.txt"))
+        files = list(self.app.input_folder().glob(f"*{self.extension}"))
         return files[0] if files else None
 
-    def process_file(self):
-        if not self.file_path or not self.file_path.exists():
-            print("❌ No TXT input file found.")
-            return
+    def read_records(self):
+        return self.reader(self.file_path)
 
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-
-        for line in lines:
-            parts = line.split("::")
-            if len(parts) < 2:
-                print(f"⚠️ Skipping malformed line: {line}")
-                continue
+    @classmethod
+    def read_positions(cls, path: Path, start: int = 0):
+        """Yield (position, record) pairs after position ``start``; positions count records read."""
+        for position, record in enumerate(cls.reader(path), 1):
+            if position > start:
+                yield position, record
 
-            record_type = parts[0].upper()
-            if record_type == "NEWS" and len(parts) == 3:
-                append_to_file(format_news(parts[1], parts[2]))
-            elif record_type == "AD" and len(parts) == 3:
-                append_to_file(format_private_ad(parts[1], parts[2]))
-            elif record_type == "QUOTE" and len(parts) == 3:
-                append_to_file(format_quote(parts[1], parts[2]))
-            else:
-                print(f"⚠️ Unknown or malformed record: {line}")
+    def process_file(self) -> bool:
+        """Publish every record of the file and remove it; returns False if nothing was processed."""
+        if not self.file_path or not self.file_path.exists():
+            print(f"❌ No {self.label} input file found.")
+            return False
 
+        checkpoint = resume_point(self.file_path, self.app)
+        batch = FeedBatch(self.app)
+        batch_size = self.batch_size if self.batch else 1
+        try:
+            for position, record in self.read_positions(self.file_path, checkpoint.position):
+                checkpoint.position = position
+                if not publish_record(record, batch, app=self.app):
+                    print(f"⚠️ Skipping malformed record: {record}")
+                elif batch_size and len(batch.records) >= batch_size:
+                    batch.commit(checkpoint)
+        except self.parse_errors:
+            print(f"❌ Failed to parse {self.label}: {self.file_path}")
+            return False
+
+        batch.commit(checkpoint)
         os.remove(self.file_path)
+        self.app.db.clear_checkpoint(self.file_path)
         print(f"✅ Processed and removed file: {self.file_path}")
+        return True
 
 
-class JSONInputProcessor:
-    """Processes records from JSON file with a list of objects."""
+class FileInputProcessor(InputProcessor):
+    """Processes records from TXT file, using <TYPE>::<field1>::<field2> format."""
 
-    def __init__(self, file_path: Path = None):
-        self.file_path = file_path or self.get_default_file()
+    extension = ".txt"
+    label = "TXT"
+    reader = staticmethod(iter_txt_records)
 
-    def get_default_file(self) -> Path:
-        if not DEFAULT_INPUT_FOLDER.exists():
-            DEFAULT_INPUT_FOLDER.mkdir()
-        files = list(DEFAULT_INPUT_FOLDER.glob("*.json"))
-        return files[0] if files else None
+    @classmethod
+    def read_positions(cls, path: Path, start: int = 0):
+        """Yield (byte offset, record) pairs from byte ``start`` on."""
+        return iter_txt_positions(path, start)
 
-    def process_file(self):
-        if not self.file_path or not self.file_path.exists():
-            print("❌ No JSON input file found.")
-            return
 
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                print(f"❌ Failed to parse JSON: {self.file_path}")
-                return
+class JSONInputProcessor(InputProcessor):
+    """Processes records from JSON file with a list of objects."""
 
-        records = data if isinstance(data, list) else [data]
+    extension = ".json"
+    label = "JSON"
+    parse_errors = json.JSONDecodeError
+    reader = staticmethod(iter_json_records)
 
-        for record in records:
-            rtype = record.get("type", "").upper()
-            if rtype == "NEWS" and "text" in record and "city" in record:
-                append_to_file(format_news(record["text"], record["city"]))
-            elif rtype == "AD" and "text" in record and "expiration_date" in record:
-                append_to_file(format_private_ad(record["text"], record["expiration_date"]))
-            elif rtype == "QUOTE" and "quote" in record and "author" in record:
-                append_to_file(format_quote(record["quote"], record["author"]))
-            else:
-                print(f"⚠️ Skipping malformed record: {record}")
 
-        os.remove(self.file_path)
-        print(f"✅ Processed and removed file: {self.file_path}")
+class XMLInputProcessor(InputProcessor):
+    """Processes records from XML file with <record> nodes."""
 
+    extension = ".xml"
+    label = "XML"
+    parse_errors = ET.ParseError
+    reader = staticmethod(iter_xml_records)
 
-class XMLInputProcessor:
-    """Processes records from XML file with <record> nodes."""
 
-    def __init__(self, file_path: Path = None):
-        self.file_path = file_path or self.get_default_file()
+PROCESSORS = (FileInputProcessor, JSONInputProcessor, XMLInputProcessor)
 
-    def get_default_file(self) -> Path:
-        if not DEFAULT_INPUT_FOLDER.exists():
-            DEFAULT_INPUT_FOLDER.mkdir()
-        files = list(DEFAULT_INPUT_FOLDER.glob("*.xml"))
-        return files[0] if files else None
 
-    def process_file(self):
-        if not self.file_path or not self.file_path.exists():
-            print("❌ No XML input file found.")
-            return
+# ----------------------------
+# PARALLEL FOLDER INGESTION
+# ----------------------------
 
-        try:
-            tree = ET.parse(self.file_path)
-            root = tree.getroot()
-        except ET.ParseError:
-            print(f"❌ Failed to parse XML: {self.file_path}")
-            return
+def parse_input_file(path: Path, start: int = 0):
+    """Worker: read and normalize the records of one input file after position ``start``.
 
-        for rec in root.findall("record"):
-            rtype = (rec.findtext("type") or "").upper()
-            if rtype == "NEWS":
-                text, city = rec.findtext("text"), rec.findtext("city")
-                if text and city:
-                    append_to_file(format_news(text, city))
-            elif rtype == "AD":
-                text, exp = rec.findtext("text"), rec.findtext("expiration_date")
-                if text and exp:
-                    append_to_file(format_private_ad(text, exp))
-            elif rtype == "QUOTE":
-                quote, author = rec.findtext("quote"), rec.findtext("author")
-                if quote and author:
-                    append_to_file(format_quote(quote, author))
+    Runs in a pool process, so it never touches the feed file or the database.
+    Returns (path, records, warnings) with records as (position, record) pairs;
+    records is None if the file failed to parse.
+    """
+    processor = next(p for p in PROCESSORS if p.extension == path.suffix.lower())
+    records, warnings = [], []
+    try:
+        for position, record in processor.read_positions(path, start):
+            normalized = normalize_record(record)
+            if normalized is None:
+                warnings.append(f"⚠️ Skipping malformed record: {record}")
+            else:
+                records.append((position, normalized))
+    except processor.parse_errors:
+        return path, None, [f"❌ Failed to parse {processor.label}: {path}"]
+    return path, records, warnings
+
+
+def pending_input_files(folder: Path = None):
+    """All TXT/JSON/XML files waiting in the input folder, sorted by name."""
+    folder = folder or get_app().input_folder_path
+    if not folder.exists():
+        folder.mkdir(parents=True)
+    extensions = {p.extension for p in PROCESSORS}
+    return sorted(p for p in folder.iterdir() if p.is_file() and p.suffix.lower() in extensions)
+
+
+def ingest_files(files, workers: int = None, batch_size: int = None, app: FeedApp = None):
+    """Ingest the given input files in order; returns (processed, failed) file counts.
+
+    With ``workers == 1`` each file is streamed through its processor in batch mode.
+    Otherwise files are parsed in a process pool, but this process stays the single
+    writer: each file is committed as its own batch(es), in the order given, so the
+    feed and DB order is deterministic.
+    """
+    app = app or get_app()
+    processed = failed = 0
+    if workers == 1:
+        for path in files:
+            processor = next(p for p in PROCESSORS if p.extension == path.suffix.lower())
+            if processor(path, batch=True, batch_size=batch_size, app=app).process_file():
+                processed += 1
             else:
-                print(f"⚠️ Skipping malformed record: {ET.tostring(rec, encoding='unicode')}")
+                failed += 1
+        return processed, failed
+
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import
+
+    checkpoints = [resume_point(path, app) for path in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(parse_input_file, files, [c.position for c in checkpoints])
+        for (path, records, warnings), checkpoint in zip(results, checkpoints):
+            for warning in warnings:
+                print(warning)
+            if records is None:
+                failed += 1
+                continue
 
-        os.remove(self.file_path)
-        print(f"✅ Processed and removed file: {self.file_path}")
+            batch = FeedBatch(app)
+            for checkpoint.position, record in records:
+                publish_record(record, batch, normalized=True, app=app)
+                if batch_size and len(batch.records) >= batch_size:
+                    batch.commit(checkpoint)
+            batch.commit(checkpoint)
+            os.remove(path)
+            app.db.clear_checkpoint(path)
+            processed += 1
+            print(f"✅ Processed and removed file: {path}")
+    return processed, failed
+
+
+def drain_input_folder(folder: Path = None, workers: int = None, app: FeedApp = None) -> int:
+    """Parse every pending input file in a process pool and publish the results.
+
+    Returns the number of files processed.
+    """
+    app = app or get_app()
+    files = pending_input_files(folder or app.input_folder_path)
+    if not files:
+        print("❌ No input files found.")
+        return 0
+    processed, _ = ingest_files(files, workers, app=app)
+    return processed
 
 
 # ----------------------------
 # CSV STATISTICS
 # ----------------------------
 
-def recreate_statistics():
-    if not OUTPUT_FILE.exists():
-        return
+def update_statistics(app: FeedApp = None):
+    """Fold newly appended feed text into the running statistics, the snapshot and the offset index."""
+    app = app or get_app()
+    app.stats.sync()
+    if app.snapshot:
+        app.snapshot.sync()
+    if app.index:
+        app.index.sync()
+    if app.segments and app.segments.rotation_due():
+        rotate_feed(app)
+
+
+def rotate_feed(app: FeedApp = None):
+    """Close the active feed file as a segment and start a new one; returns the segment or None.
+
+    The snapshot and offset index cover the active segment only, so they start over.
+    """
+    app = app or get_app()
+    segment = app.segments.rotate(app.stats)
+    if segment:
+        if app.snapshot:
+            app.snapshot.sync()
+        if app.index:
+            app.index.sync()
+        print(f"✅ Rotated feed into segment {segment['file']}")
+    return segment
+
 
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    words = re.findall(r"\b\w+\b", text.lower())
-    word_counts = Counter(words)
-    with open(WORD_COUNT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["word", "count"])
-        for word, count in sorted(word_counts.items()):
-            writer.writerow([word, count])
-
-    letters_only = [ch for ch in text if ch.isalpha()]
-    total_counts = Counter(ch.lower() for ch in letters_only)
-    upper_counts = Counter(ch.lower() for ch in text if ch.isupper())
-    with open(LETTER_STATS_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["letter", "count_all", "count_uppercase", "percentage"])
-        for letter in sorted(total_counts.keys()):
-            count_all = total_counts[letter]
-            count_upper = upper_counts.get(letter, 0)
-            percentage = round(count_upper / count_all * 100, 2) if count_all > 0 else 0
-            writer.writerow([letter, count_all, count_upper, percentage])
+def recreate_statistics(app: FeedApp = None):
+    """Rebuild word and letter statistics from the active feed file (closed segments keep theirs)."""
+    (app or get_app()).stats.rebuild()
 
 
 # ----------------------------
 # MAIN MENU
 # ----------------------------
 
-def show_menu():
+def show_menu(app: FeedApp = None):
+    app = app or get_app()
     while True:
         print("\n=== USER NEWS FEED ===")
         print("1. Publish News (manual)")
@@ -315,27 +1002,173 @@ def show_menu():
         print("4. Process from TXT File")
         print("5. Process from JSON File")
         print("6. Process from XML File")
-        print("7. Exit")
-        choice = input("Choose option (1-7): ")
+        print("7. Process all input files (parallel)")
+        print("8. Exit")
+        choice = input("Choose option (1-8): ")
 
         if choice == "1":
-            append_to_file(format_news(input("Enter news text: "), input("Enter city: ")))
+            append_to_file(format_news(input("Enter news text: "), input("Enter city: "), sink=app.db), app)
         elif choice == "2":
-            append_to_file(format_private_ad(input("Enter ad text: "), input("Enter expiration date (YYYY-MM-DD): ")))
+            append_to_file(format_private_ad(input("Enter ad text: "), input("Enter expiration date (YYYY-MM-DD): "),
+                                             sink=app.db), app)
         elif choice == "3":
-            append_to_file(format_quote(input("Enter quote: "), input("Enter author: ")))
+            append_to_file(format_quote(input("Enter quote: "), input("Enter author: "), sink=app.db), app)
         elif choice == "4":
-            FileInputProcessor().process_file()
+            FileInputProcessor(batch=True, app=app).process_file()
         elif choice == "5":
-            JSONInputProcessor().process_file()
+            JSONInputProcessor(batch=True, app=app).process_file()
         elif choice == "6":
-            XMLInputProcessor().process_file()
+            XMLInputProcessor(batch=True, app=app).process_file()
         elif choice == "7":
+            drain_input_folder(app=app)
+        elif choice == "8":
             print("Exiting...")
             break
         else:
             print("❌ Invalid choice. Try again.")
 
 
+# ----------------------------
+# COMMAND LINE
+# ----------------------------
+
+EXIT_OK = 0
+EXIT_FAILED = 1      # some input could not be processed
+EXIT_USAGE = 2       # bad arguments (argparse also exits with 2)
+EXIT_NO_INPUT = 3    # nothing to ingest
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="User news feed. Runs the interactive menu when called without a command.")
+    parser.add_argument("--feed", type=Path, default=OUTPUT_FILE, help="feed text file")
+    parser.add_argument("--db", type=Path, default=DB_FILE, help="SQLite database")
+    parser.add_argument("--input-folder", type=Path, default=DEFAULT_INPUT_FOLDER, help="default input folder")
+    parser.add_argument("--stats-interval", type=float, default=0.0,
+                        help="rewrite the statistics CSVs at most once per this many seconds")
+    parser.add_argument("--top-words", type=int,
+                        help="approximate word statistics: report only the N most frequent words and word pairs")
+    parser.add_argument("--word-error", type=float, default=1e-4,
+                        help="with --top-words: max overcount as a fraction of all words")
+    segments = parser.add_argument_group("feed segments")
+    segments.add_argument("--segment-mb", type=float, help="rotate the feed file at this size")
+    segments.add_argument("--segment-hours", type=float, help="rotate the feed file after this long")
+    segments.add_argument("--compress-segments", action="store_true", help="gzip closed segments")
+    segments.add_argument("--compact-below-mb", type=float, help="merge consecutive segments smaller than this")
+    segments.add_argument("--keep-segments", type=int, help="delete all but the newest N segments")
+    segments.add_argument("--keep-days", type=float, help="delete segments closed more than N days ago")
+    commands = parser.add_subparsers(dest="command")
+
+    ingest = commands.add_parser("ingest", help="ingest TXT/JSON/XML files and/or every file in a folder")
+    ingest.add_argument("paths", nargs="*", type=Path, help="files or folders (default: the input folder)")
+    ingest.add_argument("--batch-size", type=int, default=None, help="commit every N records (default: once per file)")
+    ingest.add_argument("--workers", type=int, default=None, help="parser processes; 1 streams files in-process")
+
+    publish = commands.add_parser("publish", help="publish one record from arguments")
+    kinds = publish.add_subparsers(dest="kind", required=True)
+    kinds.add_parser("news").add_argument("fields", nargs=2, metavar=("TEXT", "CITY"))
+    kinds.add_parser("ad").add_argument("fields", nargs=2, metavar=("TEXT", "EXPIRATION_DATE"))
+    kinds.add_parser("quote").add_argument("fields", nargs=2, metavar=("QUOTE", "AUTHOR"))
+
+    commands.add_parser("rebuild-stats", help="recount word and letter statistics from the active feed file")
+    commands.add_parser("rotate", help="close the feed file as a segment now")
+
+    search = commands.add_parser("search", help="full-text search over published records")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--type", dest="tables", action="append", choices=tuple(SEARCH_COLUMNS),
+                        help="only search this table (repeatable)")
+    search.add_argument("--raw", action="store_true", help="use FTS5 query syntax (OR, NEAR, prefix*)")
+    commands.add_parser("menu", help="interactive menu")
+    return parser
+
+
+def collect_input_files(paths, app: FeedApp = None):
+    """Expand folders into their pending input files; unsupported or missing paths are reported."""
+    extensions = {p.extension for p in PROCESSORS}
+    files, missing = [], []
+    for path in paths or [(app or get_app()).input_folder()]:
+        if path.is_dir():
+            files.extend(pending_input_files(path))
+        elif path.is_file() and path.suffix.lower() in extensions:
+            files.append(path)
+        else:
+            missing.append(path)
+    return files, missing
+
+
+def segment_settings(args):
+    """SegmentSettings from the command line, or None when rotation was not asked for."""
+    if args.segment_mb is None and args.segment_hours is None and args.command != "rotate":
+        return None
+    def mb(value):
+        return int(value * 1024 * 1024) if value is not None else None
+
+    return SegmentSettings(max_bytes=mb(args.segment_mb), max_age_hours=args.segment_hours,
+                           compress=args.compress_segments, compact_below=mb(args.compact_below_mb),
+                           keep_segments=args.keep_segments, keep_days=args.keep_days)
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    app = FeedApp(output_file=args.feed, input_folder=args.input_folder, db_path=args.db,
+                  segments=segment_settings(args), stats_interval=args.stats_interval,
+                  approx_words=ApproximateWordStats(args.top_words, args.word_error) if args.top_words else None)
+    set_app(app)
+    try:
+        return run_command(args, app)
+    finally:
+        app.close()
+
+
+def run_command(args, app: FeedApp) -> int:
+    if args.command in (None, "menu"):
+        show_menu(app)
+        return EXIT_OK
+
+    if args.command == "ingest":
+        if (args.batch_size is not None and args.batch_size < 1) or (args.workers is not None and args.workers < 1):
+            print("❌ --batch-size and --workers must be positive.", file=sys.stderr)
+            return EXIT_USAGE
+        files, missing = collect_input_files(args.paths, app)
+        for path in missing:
+            print(f"❌ Not a TXT/JSON/XML file or folder: {path}", file=sys.stderr)
+        if not files:
+            print("❌ No input files found.", file=sys.stderr)
+            return EXIT_FAILED if missing else EXIT_NO_INPUT
+        _, failed = ingest_files(files, workers=args.workers, batch_size=args.batch_size, app=app)
+        return EXIT_FAILED if failed or missing else EXIT_OK
+
+    if args.command == "publish":
+        record = {"type": {"news": "NEWS", "ad": "AD", "quote": "QUOTE"}[args.kind]}
+        record.update(zip(RECORD_FIELDS[record["type"]], args.fields))
+        publish_record(record, app=app)
+        return EXIT_OK
+
+    if args.command == "rebuild-stats":
+        recreate_statistics(app)
+        return EXIT_OK
+
+    if args.command == "search":
+        try:
+            results = app.db.search(args.query, args.limit, args.tables, args.raw)
+        except sqlite3.OperationalError as exc:
+            print(f"❌ Invalid search query: {exc}", file=sys.stderr)
+            return EXIT_USAGE
+        for result in results:
+            print(f"[{result['table']} #{result['id']}] {result['snippet']} ({result['place']})")
+        if not results:
+            print("❌ No matches.", file=sys.stderr)
+            return EXIT_NO_INPUT
+        return EXIT_OK
+
+    if args.command == "rotate":
+        if not rotate_feed(app):
+            print("❌ The feed file is empty; nothing to rotate.", file=sys.stderr)
+            return EXIT_NO_INPUT
+        return EXIT_OK
+
+    return EXIT_USAGE
+
+
 if __name__ == "__main__":
-    show_menu()
+    sys.exit(main())
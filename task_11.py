@@ -1,19 +1,21 @@
 import math
-import sqlite3
 from pathlib import Path
 
+from sqlite_storage import SQLiteStorage, StorageSettings
+
 DB_FILE = Path("cities.db")
 
 
 class CityDatabase:
     """Handles city coordinates storage and retrieval using SQLite."""
 
-    def __init__(self, db_path=DB_FILE):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path=DB_FILE, settings: StorageSettings = None):
+        self.storage = SQLiteStorage(db_path, settings)
+        self.conn = self.storage.conn
         self.create_table()
 
     def create_table(self):
-        with self.conn:
+        with self.storage.transaction():
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS cities (
                     name TEXT PRIMARY KEY,
@@ -28,11 +30,10 @@ class CityDatabase:
         return cur.fetchone()
 
     def add_city(self, name: str, latitude: float, longitude: float):
-        with self.conn:
-            self.conn.execute(
-                "INSERT OR REPLACE INTO cities (name, latitude, longitude) VALUES (?, ?, ?)",
-                (name.lower(), latitude, longitude)
-            )
+        self.storage.execute(
+            "INSERT OR REPLACE INTO cities (name, latitude, longitude) VALUES (?, ?, ?)",
+            (name.lower(), latitude, longitude)
+        )
 
 
 def haversine_distance(lat1, lon1, lat2, lon2):
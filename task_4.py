@@ -1,8 +1,11 @@
 import random
+import re
 import string
 from collections import defaultdict, Counter
 from pprint import pprint
 
+from text_utils import normalize_case
+
 
 # ----------------------------
 # MODULE 2: Random Dict Merger
@@ -51,48 +54,34 @@ def module2_solution():
 # MODULE 3: Text Normalizer
 # ----------------------------
 
-def normalize_case(text):
-    """Capitalize first letter of each sentence, lower the rest."""
-    result, capitalize_next = "", True
-    for ch in text:
-        if capitalize_next and ch.isalpha():
-            result += ch.upper()
-            capitalize_next = False
-        else:
-            result += ch.lower()
-        if ch in ".!?":
-            capitalize_next = True
-    return result
-
-
 def fix_iz(text):
     """Replace 'iz' with 'is' only when it is a separate word."""
-    result, i = "", 0
-    while i < len(text):
+    result, last = [], 0
+    for match in re.finditer(r"(?i)iz", text):
+        i = match.start()
         if (text[i:i+2].lower() == "iz" and
             (i == 0 or not text[i-1].isalpha()) and
             (i+2 == len(text) or not text[i+2].isalpha())):
-            result += "is"
-            i += 2
-        else:
-            result += text[i]
-            i += 1
-    return result
+            result.append(text[last:i])
+            result.append("is")
+            last = i + 2
+    result.append(text[last:])
+    return "".join(result)
 
 
 def extract_last_words(text):
     """Return list of last words from each sentence."""
-    last_words, word = [], ""
+    last_words, start = [], None
     for i, ch in enumerate(text):
         if ch.isalpha():
-            word += ch
-        else:
-            if word:
-                if ch in ".!?":
-                    last_words.append(word)
-                word = ""
-    if word:
-        last_words.append(word)
+            if start is None:
+                start = i
+        elif start is not None:
+            if ch in ".!?":
+                last_words.append(text[start:i])
+            start = None
+    if start is not None:
+        last_words.append(text[start:])
     return last_words
 
 
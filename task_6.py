@@ -2,29 +2,13 @@ import datetime
 from pathlib import Path
 import os
 
+from text_utils import normalize_case, normalize_field
+
 
 OUTPUT_FILE = Path("news_feed.txt")
 DEFAULT_INPUT_FOLDER = Path("input_files")
 
 
-# ----------------------------
-# CASE NORMALIZATION (from HW 3/4)
-# ----------------------------
-
-def normalize_case(text: str) -> str:
-    """Normalize case: capitalize sentence starts, lower the rest."""
-    result, capitalize_next = "", True
-    for ch in text:
-        if capitalize_next and ch.isalpha():
-            result += ch.upper()
-            capitalize_next = False
-        else:
-            result += ch.lower()
-        if ch in ".!?":
-            capitalize_next = True
-    return result
-
-
 # ----------------------------
 # RECORD PUBLISHERS (from HW 5)
 # ----------------------------
@@ -52,7 +36,7 @@ def format_private_ad(text: str, expiration_date: str) -> str:
 
 def format_quote(quote: str, author: str) -> str:
     weekday = datetime.datetime.now().strftime("%A")
-    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_case(author)}, shared on {weekday}"
+    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_field(author)}, shared on {weekday}"
 
 
 # ----------------------------
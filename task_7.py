@@ -5,6 +5,8 @@ import re
 from collections import Counter
 from pathlib import Path
 
+from text_utils import normalize_case, normalize_field
+
 
 OUTPUT_FILE = Path("news_feed.txt")
 DEFAULT_INPUT_FOLDER = Path("input_files")
@@ -12,24 +14,6 @@ WORD_COUNT_CSV = Path("word_count.csv")
 LETTER_STATS_CSV = Path("letter_stats.csv")
 
 
-# ----------------------------
-# CASE NORMALIZATION
-# ----------------------------
-
-def normalize_case(text: str) -> str:
-    """Normalize case: capitalize sentence starts, lower the rest."""
-    result, capitalize_next = "", True
-    for ch in text:
-        if capitalize_next and ch.isalpha():
-            result += ch.upper()
-            capitalize_next = False
-        else:
-            result += ch.lower()
-        if ch in ".!?":
-            capitalize_next = True
-    return result
-
-
 # ----------------------------
 # RECORD PUBLISHERS
 # ----------------------------
@@ -58,7 +42,7 @@ def format_private_ad(text: str, expiration_date: str) -> str:
 
 def format_quote(quote: str, author: str) -> str:
     weekday = datetime.datetime.now().strftime("%A")
-    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_case(author)}, shared on {weekday}"
+    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_field(author)}, shared on {weekday}"
 
 
 # ----------------------------
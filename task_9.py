@@ -1,35 +1,18 @@
 import datetime
-import csv
 import os
-import re
 import json
 import xml.etree.ElementTree as ET
-from collections import Counter
 from pathlib import Path
 
+from feed_stats import StatisticsEngine
+from text_utils import normalize_case, normalize_field
+
 
 OUTPUT_FILE = Path("news_feed.txt")
 DEFAULT_INPUT_FOLDER = Path("input_files")
 WORD_COUNT_CSV = Path("word_count.csv")
 LETTER_STATS_CSV = Path("letter_stats.csv")
-
-
-# ----------------------------
-# CASE NORMALIZATION
-# ----------------------------
-
-def normalize_case(text: str) -> str:
-    """Normalize case: capitalize sentence starts, lower the rest."""
-    result, capitalize_next = "", True
-    for ch in text:
-        if capitalize_next and ch.isalpha():
-            result += ch.upper()
-            capitalize_next = False
-        else:
-            result += ch.lower()
-        if ch in ".!?":
-            capitalize_next = True
-    return result
+STATS_STATE_FILE = Path("feed_stats.json")
 
 
 # ----------------------------
@@ -37,10 +20,10 @@ def normalize_case(text: str) -> str:
 # ----------------------------
 
 def append_to_file(record: str):
-    """Append a formatted record to the output file and regenerate statistics."""
+    """Append a formatted record to the output file and update statistics."""
     with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
         f.write(record + "\n" + "-" * 40 + "\n")
-    recreate_statistics()
+    update_statistics()
 
 
 def format_news(text: str, city: str) -> str:
@@ -60,7 +43,7 @@ def format_private_ad(text: str, expiration_date: str) -> str:
 
 def format_quote(quote: str, author: str) -> str:
     weekday = datetime.datetime.now().strftime("%A")
-    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_case(author)}, shared on {weekday}"
+    return f"QUOTE OF THE DAY ------------\n\"{normalize_case(quote)}\"\n— {normalize_field(author)}, shared on {weekday}"
 
 
 # ----------------------------
@@ -197,33 +180,17 @@ class XMLInputProcessor:
 # CSV STATISTICS
 # ----------------------------
 
+stats = StatisticsEngine(OUTPUT_FILE, WORD_COUNT_CSV, LETTER_STATS_CSV, STATS_STATE_FILE)
+
+
+def update_statistics():
+    """Fold newly appended feed text into the running word and letter statistics."""
+    stats.sync()
+
+
 def recreate_statistics():
-    """Recreate CSV files for word and letter counts."""
-    if not OUTPUT_FILE.exists():
-        return
-
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    words = re.findall(r"\b\w+\b", text.lower())
-    word_counts = Counter(words)
-    with open(WORD_COUNT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["word", "count"])
-        for word, count in sorted(word_counts.items()):
-            writer.writerow([word, count])
-
-    letters_only = [ch for ch in text if ch.isalpha()]
-    total_counts = Counter(ch.lower() for ch in letters_only)
-    upper_counts = Counter(ch.lower() for ch in text if ch.isupper())
-    with open(LETTER_STATS_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["letter", "count_all", "count_uppercase", "percentage"])
-        for letter in sorted(total_counts.keys()):
-            count_all = total_counts[letter]
-            count_upper = upper_counts.get(letter, 0)
-            percentage = round(count_upper / count_all * 100, 2) if count_all > 0 else 0
-            writer.writerow([letter, count_all, count_upper, percentage])
+    """Rebuild word and letter statistics from the whole feed file."""
+    stats.rebuild()
 
 
 # ----------------------------
@@ -0,0 +1,62 @@
+import re
+from functools import lru_cache
+
+
+# A sentence chunk: everything up to and including the next ".", "!" or "?".
+SENTENCE_CHUNK = re.compile(r"[^.!?]*[.!?]?")
+
+
+def _lower(text: str) -> str:
+    """Lowercase like ``ch.lower()`` applied per character.
+
+    str.lower() on a whole string turns a final capital sigma into "ς", which the
+    per-character lowering never does, so strings containing "Σ" take the slow path.
+    """
+    return "".join(map(str.lower, text)) if "Σ" in text else text.lower()
+
+
+def normalize_case(text: str) -> str:
+    """Normalize case: capitalize sentence starts, lower the rest.
+
+    Works chunk by chunk: every chunk after a sentence terminator starts a new
+    sentence, so only its first letter is upper-cased and the rest is lowered in
+    one slice. Runs in linear time.
+    """
+    parts = []
+    for match in SENTENCE_CHUNK.finditer(text):
+        chunk = match.group()
+        for i, ch in enumerate(chunk):
+            if ch.isalpha():
+                parts.append(_lower(chunk[:i]))
+                parts.append(ch.upper())
+                parts.append(_lower(chunk[i + 1:]))
+                break
+        else:
+            parts.append(_lower(chunk))
+    return "".join(parts)
+
+
+def normalize_many(texts) -> list:
+    """Normalize case for every string in an iterable."""
+    return [normalize_case(text) for text in texts]
+
+
+# Fields at most this long (author names and the like) go through the LRU cache.
+SHORT_FIELD_LIMIT = 64
+
+
+@lru_cache(maxsize=4096)
+def _normalize_short(text: str) -> str:
+    return normalize_case(text)
+
+
+def normalize_field(text: str) -> str:
+    """normalize_case for short, frequently repeated fields, memoized in a bounded LRU cache."""
+    if len(text) > SHORT_FIELD_LIMIT:
+        return normalize_case(text)
+    return _normalize_short(text)
+
+
+def field_cache_info():
+    """Hit/miss counters of the normalize_field cache (functools CacheInfo)."""
+    return _normalize_short.cache_info()